@@ -1,5 +1,14 @@
-import pandas as pd
-import pycountry
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from classification import SCHEMES, classify  # noqa: E402
+from country_codes import alpha_3_to_alpha_2  # noqa: E402
+from map_series import MapSeries, YearLabel  # noqa: E402
+from svg_map import SvgMap  # noqa: E402
+import wdi  # noqa: E402
 
 
 european_countries = {
@@ -11,49 +20,72 @@ european_countries = {
 }
 
 
-def convert_country_code(code3):
+PALETTE = [
+    '#fee5d9', '#fcc5c0', '#fa9fb5', '#f768a1', '#dd3497', '#ae017e', '#7a0177'
+]
+BREAKS = [30000, 40000, 50000, 60000, 70000, 80000]
+
+MAP = 'Europe GDP per capita, PPP (current international USD).svg'
+# The <tspan>s of the map's legend labels, from the top; its swatches
+# already show PALETTE
+LEGEND_LABELS = [
+    'tspan11', 'tspan1', 'tspan2', 'tspan3', 'tspan6', 'tspan7', 'tspan8'
+]
+DATA = ('API_NY.GDP.PCAP.PP.CD_DS2_en_csv_v2_46/'
+        'API_NY.GDP.PCAP.PP.CD_DS2_en_csv_v2_46.csv')
+
+
+def thousands(value):
+    return f"{value:,.0f}".replace(',', '.')
+
+
+def legend_texts(classification):
+    labels = classification.labels(
+        thousands, lowest='< {} USD', middle='{} - {} USD', highest='> {} USD')
+    return dict(zip(LEGEND_LABELS, labels))
+
+
+parser = argparse.ArgumentParser(
+    description='Colour the Europe GDP (PPP) per capita map')
+parser.add_argument(
+    '--years', nargs='*', type=int, metavar='YEAR',
+    help='also write a map for every year from FIRST to LAST (default: all '
+         'years with data) to frames/, with breaks shared by all years')
+parser.add_argument(
+    '--scheme', choices=['fixed', *SCHEMES], default='fixed',
+    help='breaks for --years (default: the fixed breaks of the latest map)')
+parser.add_argument(
+    '--animate', action='store_true',
+    help='with --years, also write the years as one animated SVG')
+args = parser.parse_args()
+if args.years is not None and len(args.years) not in (0, 2):
+    parser.error('--years takes a FIRST and a LAST year, or none')
+if args.years and args.years[0] > args.years[1]:
+    parser.error('--years FIRST must not be later than LAST')
+
+svg_map = SvgMap(MAP)
+
+# Load the --years data up front so a range without data is rejected
+# before any map is written
+if args.years is not None:
+    years = range(args.years[0], args.years[1] + 1) if args.years else None
     try:
-        return pycountry.countries.get(alpha_3=code3).alpha_2
-    except (AttributeError, KeyError):
-        return None
-
-
-def get_color(value):
-    if value <= 30000:
-        return '#fee5d9'
-    elif value <= 40000:
-        return '#fcc5c0'
-    elif value <= 50000:
-        return '#fa9fb5'
-    elif value <= 60000:
-        return '#f768a1'
-    elif value <= 70000:
-        return '#dd3497'
-    elif value <= 80000:
-        return '#ae017e'
-    else:
-        return '#7a0177'
-
-
-def generate_css():
-    color_groups = df_europe.groupby('color')['country'].apply(list)
-
-    css_rules = []
-    for color, countries in color_groups.items():
-        country_selectors = [f"#{code.lower()}" for code in countries]
-        selector = ','.join(country_selectors)
-        css_rules.append(f"{selector} {{fill:{color}}}")
-
-    return '\n'.join(css_rules)
-
-
-df = pd.read_csv(
-    'API_NY.GDP.PCAP.PP.CD_DS2_en_csv_v2_46/API_NY.GDP.PCAP.PP.CD_DS2_en_csv_v2_46.csv',
-    skiprows=4)
-
-df = df.drop(df.columns[-1], axis=1)
-df = df.drop(df.columns[2:60], axis=1)
-df['country'] = df['Country Code'].apply(convert_country_code)
+        df_years = wdi.load(DATA, years=years)
+    except ValueError as e:
+        parser.error(str(e))
+    df_years.index = alpha_3_to_alpha_2(df_years.index.to_series())
+    df_years = df_years[df_years.index.isin(european_countries)]
+    df_years.index = df_years.index.str.lower()
+    # Microstates such as Monaco aren't drawn on the map
+    df_years = df_years[df_years.index.isin(svg_map.elements)]
+    df_years = df_years.loc[:, df_years.notna().any()]
+    if df_years.columns.empty:
+        parser.error('no European data for {}-{}'.format(*args.years))
+
+
+df = wdi.load(DATA, years=['2022', '2023']).reset_index()
+
+df['country'] = alpha_3_to_alpha_2(df['Country Code'])
 df['latest'] = df['2023'].combine_first(df['2022'])
 
 df_europe = df[df['country'].isin(european_countries)]
@@ -65,14 +97,34 @@ max_val = ((df_europe['latest'].max() // 10000) + 1) * 10000
 print(f"Min value (rounded to 10k): {min_val}")
 print(f"Max value (rounded to 10k): {max_val}")
 
-ranges = [0, 30000, 40000, 50000, 60000, 70000, 80000, float('inf')]
+classification = classify(df_europe['latest'], PALETTE, BREAKS)
 
 # Let's see how this distributes
-bins = pd.cut(df_europe['latest'],
-              bins=ranges,
-              include_lowest=True)
-print(bins.value_counts().sort_index())
-
-df_europe['color'] = df_europe['latest'].apply(get_color)
-
-print(generate_css())
+for label, count in zip(classification.labels(), classification.counts()):
+    print(f"{label:>18}  {count}")
+
+df_europe['color'] = classification.colours
+
+fills = dict(zip(df_europe['country'].str.lower(), df_europe['color']))
+
+svg_map.write(MAP, fills, texts=legend_texts(classification))
+
+if args.years is not None:
+    first, last = df_years.columns[0], df_years.columns[-1]
+
+    series = MapSeries(
+        svg_map, df_years, PALETTE,
+        BREAKS if args.scheme == 'fixed' else args.scheme)
+    print(f"Breaks for {first}-{last}: "
+          f"{', '.join(map(thousands, series.classification.breaks))}")
+
+    labels = legend_texts(series.classification)
+    series.write_frames(
+        f"frames/{Path(MAP).stem} {{year}}.svg",
+        texts=lambda year: {
+            'tspan5': f"current international $, {year}", **labels})
+    if args.animate:
+        series.write_animation(
+            f"frames/{Path(MAP).stem} {first}-{last}.svg",
+            label=YearLabel(x=182.56, y=48),
+            texts=labels)
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from classification import classify  # noqa: E402
+from svg_map import SvgMap  # noqa: E402
+
+MAP = "Europe_VAT_Tax_Rates.svg"
+
+# fmt: off
+# Standard VAT rates (%) by the id of the country's shape in the map
+# (Luxembourg's is "lx"); sources in Europe_VAT_Tax_Rates.md
+VAT_RATES = {
+    "al": 20, "at": 20, "ba": 17, "be": 21, "bg": 20, "by": 20, "ch": 7.7,
+    "cy": 19, "cz": 21, "de": 19, "dk": 25, "ee": 20, "es": 21, "fi": 24,
+    "fr": 20, "gb": 20, "gr": 24, "hr": 25, "hu": 27, "ie": 23, "im": 20,
+    "is": 24, "it": 22, "lt": 21, "lv": 21, "lx": 17, "md": 20, "me": 21,
+    "mk": 18, "mt": 18, "nl": 21, "no": 25, "pl": 23, "pt": 23, "ro": 19,
+    "rs": 20, "se": 25, "si": 22, "sk": 20, "ua": 14, "xk": 18,
+}
+
+# One colour per whole percent from 8% (and below) to 27%, matching the
+# gradient in the map's legend
+PALETTE = [
+    "#ebf8de", "#d9efdc", "#c8e7d9", "#b8dfd7", "#a9d7d5",
+    "#95ced2", "#86c6d0", "#74bdcd", "#65b6cb", "#53adc8",
+    "#499dbc", "#408fb2", "#3782a8", "#2d729c", "#256593",
+    "#1a5486", "#11487d", "#083972", "#002d69", "#001634",
+]
+# fmt: on
+
+BREAKS = [rate + 0.5 for rate in range(8, 27)]
+
+classification = classify(list(VAT_RATES.values()), PALETTE, BREAKS)
+# The rates are kept next to their colours in the map's stylesheet
+SvgMap(MAP).write(
+    MAP,
+    dict(zip(VAT_RATES, classification.colours)),
+    notes={country: f"VAT: {rate}" for country, rate in VAT_RATES.items()},
+)
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Union
+
+import numpy as np
+
+
+# The classes of a choropleth for a whole array of values at once (one
+# column, or a country × year matrix). `breaks` are the inclusive upper
+# bounds of every class but the last, so class i holds
+# breaks[i - 1] < value <= breaks[i]. Missing values get class -1 and no
+# colour.
+@dataclass
+class Classification:
+    breaks: np.ndarray
+    classes: np.ndarray
+    colours: np.ndarray
+
+    def counts(self) -> np.ndarray:
+        return np.bincount(
+            self.classes[self.classes >= 0], minlength=len(self.breaks) + 1
+        )
+
+    def labels(
+        self,
+        fmt: Callable[[float], str] = "{:,.0f}".format,
+        lowest: str = "≤ {}",
+        middle: str = "{} – {}",
+        highest: str = "> {}",
+    ) -> List[str]:
+        bounds = [fmt(bound) for bound in self.breaks]
+        return (
+            [lowest.format(bounds[0])]
+            + [middle.format(*pair) for pair in zip(bounds, bounds[1:])]
+            + [highest.format(bounds[-1])]
+        )
+
+
+def equal_interval(values: np.ndarray, k: int) -> np.ndarray:
+    return np.linspace(np.nanmin(values), np.nanmax(values), k + 1)[1:-1]
+
+
+def quantile(values: np.ndarray, k: int) -> np.ndarray:
+    return np.nanquantile(values, np.linspace(0, 1, k + 1)[1:-1])
+
+
+# Fisher-Jenks natural breaks: the split of the sorted values into k runs
+# with the least total squared deviation from each run's mean. Dynamic
+# programming over prefix sums, one vectorised step per class and value.
+def jenks(values: np.ndarray, k: int) -> np.ndarray:
+    x = np.sort(values[~np.isnan(values)], axis=None)
+    n = len(x)
+    if n == 0:
+        raise ValueError("Jenks breaks need at least one value")
+    if n <= k:
+        # A class per value; the classes above the largest stay empty
+        return np.concatenate([x[:-1], np.repeat(x[-1:], k - n)])
+
+    s1 = np.concatenate([[0], np.cumsum(x)])
+    s2 = np.concatenate([[0], np.cumsum(x * x)])
+
+    def cost(starts, end) -> np.ndarray:
+        total = s1[end] - s1[starts]
+        return s2[end] - s2[starts] - total * total / (end - starts)
+
+    # best[c, j]: least cost of x[:j] in c + 1 classes, and where the last
+    # of those classes starts
+    best = np.full((k, n + 1), np.inf)
+    start = np.zeros((k, n + 1), dtype=int)
+    best[0, 1:] = cost(0, np.arange(1, n + 1))
+    for c in range(1, k):
+        for j in range(c + 1, n + 1):
+            starts = np.arange(c, j)
+            total = best[c - 1, starts] + cost(starts, j)
+            i = np.argmin(total)
+            best[c, j] = total[i]
+            start[c, j] = starts[i]
+
+    breaks = []
+    j = n
+    for c in range(k - 1, 0, -1):
+        j = start[c, j]
+        breaks.append(x[j - 1])
+    return np.array(breaks[::-1])
+
+
+SCHEMES: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "equal_interval": equal_interval,
+    "quantile": quantile,
+    "jenks": jenks,
+}
+
+
+# One class per palette colour. `breaks` is either the name of a scheme
+# computing them from the values or the fixed upper bounds themselves.
+def classify(
+    values,
+    palette: Sequence[str],
+    breaks: Union[str, Sequence[float]] = "quantile",
+) -> Classification:
+    values = np.asarray(values, dtype=float)
+    if isinstance(breaks, str):
+        breaks = SCHEMES[breaks](values, len(palette))
+    breaks = np.asarray(breaks, dtype=float)
+    if len(breaks) != len(palette) - 1:
+        raise ValueError(
+            f"{len(palette)} colours need {len(palette) - 1} breaks, "
+            f"got {len(breaks)}"
+        )
+
+    classes = np.searchsorted(breaks, values, side="left")
+    classes[np.isnan(values)] = -1
+
+    # Index -1, for missing values, picks the trailing None
+    colours = np.array([*palette, None], dtype=object)[classes]
+    return Classification(breaks, classes, colours)
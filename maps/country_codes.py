@@ -0,0 +1,47 @@
+from functools import cache
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+# ISO 3166 alpha-2 and alpha-3 codes, generated once from pycountry (run
+# this module to refresh it) so that the scripts need neither pycountry's
+# database nor a lookup per row
+CODES_FILE = Path(__file__).with_name("country_codes.csv")
+
+# Countries missing from ISO 3166 that the World Bank reports on: Kosovo
+EXTRA_COUNTRIES = [("XK", "XKX")]
+
+
+@cache
+def _table() -> pd.DataFrame:
+    # keep_default_na=False, or Namibia's "NA" would be read as missing
+    return pd.read_csv(CODES_FILE, dtype=str, keep_default_na=False)
+
+
+@cache
+def _alpha_2_by_alpha_3() -> Dict[str, str]:
+    table = _table()
+    return dict(zip(table["alpha_3"], table["alpha_2"]))
+
+
+# Aggregates such as "AFE" (Africa Eastern and Southern) and unknown codes
+# come back as NaN
+def alpha_3_to_alpha_2(codes: pd.Series) -> pd.Series:
+    return codes.map(_alpha_2_by_alpha_3())
+
+
+def _generate():
+    import pycountry
+
+    rows = {
+        (country.alpha_2, country.alpha_3) for country in pycountry.countries
+    }
+    rows.update(EXTRA_COUNTRIES)
+
+    table = pd.DataFrame(sorted(rows), columns=["alpha_2", "alpha_3"])
+    table.to_csv(CODES_FILE, index=False)
+
+
+if __name__ == "__main__":
+    _generate()
@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from xml.sax.saxutils import escape, quoteattr
+
+import pandas as pd
+
+from classification import Classification, classify
+from svg_map import Legend, SvgMap
+
+
+# Where the year goes in an animation, and how it looks
+@dataclass
+class YearLabel:
+    x: float
+    y: float
+    style: str = (
+        "font-weight:bold;font-size:16px;font-family:'Liberation Sans';"
+        "text-anchor:middle;fill:#000000"
+    )
+
+
+# One choropleth per year from a frame of values with the map's element ids
+# as rows and years as columns. The whole matrix is classified in one pass,
+# so scheme breaks (quantiles, Jenks, ...) are shared by every year and a
+# colour means the same thing in every frame. Countries without a value
+# for a year are filled with `no_data`, by default the grey the maps here
+# use for countries without data.
+class MapSeries:
+
+    def __init__(
+        self,
+        svg_map: SvgMap,
+        values: pd.DataFrame,
+        palette: Sequence[str],
+        breaks: Union[str, Sequence[float]] = "quantile",
+        no_data: str = "#c0c0c0",
+    ):
+        unknown = sorted(set(values.index) - set(svg_map.elements))
+        if unknown:
+            raise KeyError(f"No elements with ids {', '.join(unknown)}")
+
+        self.svg_map = svg_map
+        self.values = values
+        self.no_data = no_data
+        self.years = [str(year) for year in values.columns]
+        self.classification: Classification = classify(
+            values.to_numpy(), palette, breaks
+        )
+
+    def fills(self, year: str) -> Dict[str, str]:
+        colours = self.classification.colours[:, self.years.index(year)]
+        return {
+            element_id: colour or self.no_data
+            for element_id, colour in zip(self.values.index, colours)
+        }
+
+    # `output` holds a {year} field; files are rendered from the one parsed
+    # template and written from a thread pool
+    def write_frames(
+        self,
+        output: str,
+        legend: Optional[Legend] = None,
+        texts: Optional[Callable[[str], Dict[str, str]]] = None,
+        workers: Optional[int] = None,
+    ) -> List[str]:
+        paths = [output.format(year=year) for year in self.years]
+        for directory in {os.path.dirname(path) for path in paths} - {""}:
+            os.makedirs(directory, exist_ok=True)
+
+        def write(year: str, path: str):
+            self.svg_map.write(
+                path,
+                self.fills(year),
+                legend,
+                texts(year) if texts else None,
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(write, self.years, paths))
+        return paths
+
+    # A single SVG stepping through the years with SMIL <animate> elements,
+    # `seconds` per year, looping. Countries are coloured by the animation
+    # alone (viewers without SMIL show the map uncoloured).
+    def write_animation(
+        self,
+        output: str,
+        legend: Optional[Legend] = None,
+        label: Optional[YearLabel] = None,
+        seconds: float = 0.5,
+        texts: Optional[Dict[str, str]] = None,
+    ):
+        steps = len(self.years)
+        key_times = ";".join(f"{i / steps:.6g}" for i in range(steps))
+        timing = (
+            f'dur="{steps * seconds:g}s" keyTimes="{key_times}" '
+            'calcMode="discrete" repeatCount="indefinite"'
+        )
+
+        markup = []
+        for element_id, colours in zip(
+            self.values.index, self.classification.colours
+        ):
+            values = ";".join(colour or self.no_data for colour in colours)
+            markup.append(
+                f"<animate href={quoteattr(f'#{element_id}')} "
+                f'attributeName="fill" values={quoteattr(values)} {timing} />'
+            )
+
+        if label is not None:
+            for step, year in enumerate(self.years):
+                values = ";".join(
+                    "visible" if i == step else "hidden" for i in range(steps)
+                )
+                markup.append(
+                    f'<text x="{label.x:g}" y="{label.y:g}" '
+                    f'visibility="hidden" style={quoteattr(label.style)}>'
+                    f"{escape(year)}"
+                    f'<animate attributeName="visibility" '
+                    f"values={quoteattr(values)} {timing} /></text>"
+                )
+
+        self.svg_map.write(output, {}, legend, texts, "".join(markup))
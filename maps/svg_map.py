@@ -0,0 +1,259 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.parsers import expat
+from xml.sax.saxutils import escape, quoteattr
+
+SVG_NS = "http://www.w3.org/2000/svg"
+STYLE = f"{{{SVG_NS}}}style"
+
+# The rest of a start tag, quoted attribute values may hold ">"
+TAG_END = re.compile(rb"""(?:[^>"']|"[^"]*"|'[^']*')*>""")
+INDENT = re.compile(r"^[ \t]*(?=\S)", re.MULTILINE)
+
+# Filled in on every render; the markers can't occur in an Inkscape file
+SLOT = re.compile(r"@@slot:([^@]+)@@")
+
+# Rules colouring nothing but countries by id, e.g. "#at,#be {fill:#3782a8}"
+# or "#at { fill:#3782a8; } /* VAT: 20 */": what a previous render (or a
+# hand-made map) left in the stylesheet, replaced on every render
+FILL_RULE = re.compile(
+    r"[ \t]*#[\w-]+(?:\s*,\s*#[\w-]+)*\s*\{\s*fill\s*:\s*[^;{}]+;?\s*\}"
+    r"(?:[ \t]*/\*.*?\*/)?[ \t]*\n?"
+)
+
+
+# Colour swatches with a label each, stacked from (x, y) downwards
+@dataclass
+class Legend:
+    entries: Sequence[Tuple[str, str]]
+    x: float = 10
+    y: float = 80
+    spacing: float = 16
+    size: float = 12
+    gap: float = 6
+    style: str = (
+        "font-weight:bold;font-size:9.33333px;"
+        "font-family:'Liberation Sans';fill:#000000"
+    )
+    swatch_style: str = "stroke:#000000;stroke-width:0.5"
+
+    def markup(self) -> str:
+        items = []
+        for i, (colour, label) in enumerate(self.entries):
+            y = self.y + i * self.spacing
+            items.append(
+                f"<rect x={_number(self.x)} y={_number(y)} "
+                f"width={_number(self.size)} height={_number(self.size)} "
+                f"style={quoteattr(f'fill:{colour};{self.swatch_style}')} />"
+                f"<text x={_number(self.x + self.size + self.gap)} "
+                f"y={_number(y + self.size * 0.78)} "
+                f"style={quoteattr(self.style)}>{escape(label)}</text>"
+            )
+        return f'<g id="legend">{"".join(items)}</g>'
+
+
+# A map template with slots for the country fills (in the first <style>,
+# or `style_id`), the legend (the element with id "legend", added if
+# missing), the text of every element with an id and plain text content,
+# such as a title's or a legend label's <tspan>, and extra markup drawn on
+# top. The slots are cut out of the source file as it is, so everything
+# else in a hand-maintained map (layout, namespaces, comments) is written
+# back byte for byte. Each render only joins strings, so one SvgMap can
+# write any number of variants, from several threads at once.
+class SvgMap:
+
+    def __init__(self, path: str, style_id: Optional[str] = None):
+        with open(path, "rb") as f:
+            source = f.read()
+
+        root = ET.fromstring(source)
+        self.elements: Dict[str, ET.Element] = {
+            element.get("id"): element
+            for element in root.iter()
+            if element.get("id")
+        }
+        spans = dict(zip(root.iter(), _spans(source)))
+        root_span = spans[root]
+
+        self._defaults = {"fills": "", "legend": "", "overlay": ""}
+        edits = []
+
+        style = (
+            self.elements[style_id] if style_id else root.find(f".//{STYLE}")
+        )
+        if style is None:
+            self._indent = ""
+            stylesheet = "<style>\n@@slot:fills@@\n</style>"
+            edits.append((root_span[1], root_span[1], stylesheet))
+        else:
+            _, content_start, content_end, _ = spans[style]
+            css, self._indent = _fills_template(
+                source[content_start:content_end].decode()
+            )
+            edits.append((content_start, content_end, css))
+
+        for element_id, element in self.elements.items():
+            if (
+                element.tag != STYLE
+                and len(element) == 0
+                and (element.text or "").strip()
+            ):
+                _, content_start, content_end, _ = spans[element]
+                slot = f"text:{element_id}"
+                self._defaults[slot] = source[
+                    content_start:content_end
+                ].decode()
+                edits.append((content_start, content_end, f"@@slot:{slot}@@"))
+
+        # The template's own legend becomes the default of its slot, with
+        # its labels left in text slots of their own
+        legend = self.elements.get("legend")
+        if legend is None:
+            edits.append((root_span[2], root_span[2], "@@slot:legend@@"))
+        else:
+            legend_start, _, _, legend_end = spans[legend]
+            self._defaults["legend"] = _splice(
+                source, legend_start, legend_end, edits
+            )
+            edits.append((legend_start, legend_end, "@@slot:legend@@"))
+
+        # Free-form markup drawn over everything else
+        edits.append((root_span[2], root_span[2], "@@slot:overlay@@"))
+
+        self._chunks = SLOT.split(_splice(source, 0, len(source), edits))
+
+    def render(
+        self,
+        fills: Dict[str, str],
+        legend: Optional[Legend] = None,
+        texts: Optional[Dict[str, str]] = None,
+        overlay: str = "",
+        notes: Optional[Dict[str, str]] = None,
+    ) -> str:
+        unknown = sorted(set(fills) - set(self.elements))
+        if unknown:
+            raise KeyError(f"No elements with ids {', '.join(unknown)}")
+
+        values = dict(self._defaults)
+        values["fills"] = "\n".join(
+            self._indent + rule
+            for rule in escape(fill_css(fills, notes)).splitlines()
+        )
+        values["overlay"] = overlay
+        for element_id, text in (texts or {}).items():
+            if f"text:{element_id}" not in values:
+                raise KeyError(f"No text element with id {element_id}")
+            values[f"text:{element_id}"] = escape(text)
+
+        if legend is not None:
+            values["legend"] = legend.markup()
+        else:
+            values["legend"] = SLOT.sub(
+                lambda match: values[match[1]], values["legend"]
+            )
+
+        # Literal text at even positions, slot names at odd ones
+        return "".join(
+            values[chunk] if i % 2 else chunk
+            for i, chunk in enumerate(self._chunks)
+        )
+
+    def write(self, path: str, *args, **kwargs):
+        svg = self.render(*args, **kwargs)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(svg)
+        os.replace(temp_path, path)
+
+
+# One rule per colour, "#id1,#id2 {fill:colour}", in colour order. With
+# `notes`, one rule per id instead, in the order of `fills`, each followed
+# by its note as a comment, e.g. "#at {fill:#3782a8} /* VAT: 20 */".
+def fill_css(
+    fills: Dict[str, str], notes: Optional[Dict[str, str]] = None
+) -> str:
+    if notes is not None:
+        return "\n".join(
+            f"#{element_id} {{fill:{colour}}}"
+            + (f" /* {notes[element_id]} */" if element_id in notes else "")
+            for element_id, colour in fills.items()
+        )
+
+    groups = defaultdict(list)
+    for element_id, colour in fills.items():
+        groups[colour].append(element_id)
+
+    return "\n".join(
+        f"{','.join(f'#{i}' for i in sorted(ids))} {{fill:{colour}}}"
+        for colour, ids in sorted(groups.items())
+    )
+
+
+def _number(value: float) -> str:
+    return quoteattr(f"{value:.6g}")
+
+
+# The stylesheet with a slot for the fill rules, in place of the first one
+# or after the rest, and their indent. Every fill-only rule is dropped,
+# whether a previous render wrote it or it was pasted in by hand, so
+# writing a map over its own template is idempotent.
+def _fills_template(css: str) -> Tuple[str, str]:
+    first = FILL_RULE.search(css)
+    line = first or INDENT.search(css)
+    indent = re.match(r"[ \t]*", line[0])[0] if line else ""
+
+    if first is None:
+        base = css.rstrip()
+        return f"{base}\n@@slot:fills@@{css[len(base):]}", indent
+
+    slot = "@@slot:fills@@" + ("\n" if first[0].endswith("\n") else "")
+    before = FILL_RULE.sub("", css[: first.start()])
+    after = FILL_RULE.sub("", css[first.end() :])
+    return before + slot + after, indent
+
+
+# (start tag, content start, content end, end of the end tag) byte offsets
+# of every element, in document order
+def _spans(source: bytes) -> List[List[int]]:
+    parser = expat.ParserCreate()
+    spans, open_spans = [], []
+
+    def start(name, attributes):
+        position = parser.CurrentByteIndex
+        tag_end = TAG_END.match(source, position).end()
+        span = [position, tag_end, tag_end, tag_end]
+        spans.append(span)
+        open_spans.append(span)
+
+    def end(name):
+        span = open_spans.pop()
+        position = parser.CurrentByteIndex
+        # An empty element, <g/>, ends where its start tag does
+        if position != span[1]:
+            span[2] = position
+            span[3] = source.index(b">", position) + 1
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(source, True)
+    return spans
+
+
+# source[start:end] as text with the (start, end, text) edits inside it
+# applied; edits nested in an earlier one are part of that one
+def _splice(
+    source: bytes, start: int, end: int, edits: List[Tuple[int, int, str]]
+) -> str:
+    pieces = []
+    position = start
+    for edit_start, edit_end, text in sorted(edits, key=lambda e: e[0]):
+        if edit_start < position or edit_end > end:
+            continue
+        pieces += [source[position:edit_start].decode(), text]
+        position = edit_end
+    pieces.append(source[position:end].decode())
+    return "".join(pieces)
@@ -0,0 +1,70 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from classification import classify, jenks
+
+PALETTE = ["#a", "#b", "#c", "#d", "#e"]
+
+
+# The least total squared deviation over every split of the sorted values
+# into k runs
+def _brute_force_jenks(values, k):
+    x = np.sort(values)
+
+    def cost(cuts):
+        runs = np.split(x, cuts)
+        return sum(((run - run.mean()) ** 2).sum() for run in runs)
+
+    cuts = min(itertools.combinations(range(1, len(x)), k - 1), key=cost)
+    return x[[cut - 1 for cut in cuts]]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_jenks_matches_brute_force(seed):
+    values = np.random.default_rng(seed).lognormal(size=12)
+
+    np.testing.assert_array_equal(
+        jenks(values, 4), _brute_force_jenks(values, 4)
+    )
+
+
+def test_value_on_a_break_is_in_the_lower_class():
+    classification = classify([10, 10.5, 20, 20.5], PALETTE[:3], [10, 20])
+
+    assert classification.classes.tolist() == [0, 1, 1, 2]
+    assert classification.colours.tolist() == ["#a", "#b", "#b", "#c"]
+
+
+def test_missing_values_have_no_class_or_colour():
+    classification = classify([5, np.nan, 15], PALETTE[:2], [10])
+
+    assert classification.classes.tolist() == [0, -1, 1]
+    assert classification.colours.tolist() == ["#a", None, "#b"]
+    assert classification.counts().tolist() == [1, 1]
+
+
+def test_counts_and_labels():
+    classification = classify(
+        [[1, 5000], [15000, 25000]], PALETTE[:3], [10000, 20000]
+    )
+
+    assert classification.classes.shape == (2, 2)
+    assert classification.counts().tolist() == [2, 1, 1]
+    assert classification.labels() == [
+        "≤ 10,000",
+        "10,000 – 20,000",
+        "> 20,000",
+    ]
+
+
+def test_jenks_with_no_more_values_than_classes():
+    classification = classify([1, 2, 3], PALETTE, "jenks")
+
+    assert classification.breaks.tolist() == [1, 2, 3, 3]
+    assert classification.classes.tolist() == [0, 1, 2]
+    assert classification.counts().tolist() == [1, 1, 1, 0, 0]
+
+    with pytest.raises(ValueError, match="at least one value"):
+        classify([np.nan], PALETTE, "jenks")
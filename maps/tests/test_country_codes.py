@@ -0,0 +1,24 @@
+import pandas as pd
+
+from country_codes import _table, alpha_3_to_alpha_2
+
+
+def test_namibia_survives_the_csv_read():
+    table = _table()
+
+    assert not table.isna().any().any()
+    assert table.loc[table["alpha_3"] == "NAM", "alpha_2"].tolist() == ["NA"]
+
+
+def test_kosovo_has_its_world_bank_code():
+    table = _table()
+
+    assert table.loc[table["alpha_2"] == "XK", "alpha_3"].tolist() == ["XKX"]
+
+
+def test_alpha_3_to_alpha_2():
+    codes = pd.Series(["SWE", "NAM", "XKX", "AFE", "EUU", "ZZZ"])
+
+    assert alpha_3_to_alpha_2(codes).tolist()[:3] == ["SE", "NA", "XK"]
+    # Aggregates and unknown codes
+    assert alpha_3_to_alpha_2(codes).iloc[3:].isna().all()
@@ -0,0 +1,93 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from map_series import MapSeries, YearLabel
+from svg_map import SVG_NS, SvgMap
+
+TEMPLATE = """\
+<svg xmlns="http://www.w3.org/2000/svg">
+  <style>
+    #country {fill:#c0c0c0}
+  </style>
+  <g id="country">
+    <path id="aa" d="M 0 0 H 10 V 10 z" />
+    <path id="bb" d="M 20 0 H 30 V 10 z" />
+    <path id="cc" d="M 40 0 H 50 V 10 z" />
+  </g>
+  <text><tspan id="year">2000</tspan></text>
+</svg>
+"""
+PALETTE = ["#low", "#high"]
+ANIMATE = f"{{{SVG_NS}}}animate"
+
+# 2021 has no data at all, cc none in any year
+VALUES = pd.DataFrame(
+    {
+        "2020": [1.0, 3.0, np.nan],
+        "2021": [np.nan, np.nan, np.nan],
+        "2022": [4.0, np.nan, np.nan],
+    },
+    index=["aa", "bb", "cc"],
+)
+
+
+def _series(tmp_path, no_data="#c0c0c0"):
+    path = tmp_path / "map.svg"
+    path.write_text(TEMPLATE)
+    return MapSeries(SvgMap(path), VALUES, PALETTE, [2], no_data=no_data)
+
+
+def test_frames(tmp_path):
+    series = _series(tmp_path, no_data="#none")
+
+    paths = series.write_frames(
+        str(tmp_path / "frames" / "map {year}.svg"),
+        texts=lambda year: {"year": year},
+    )
+
+    assert [p.rsplit("/", 1)[1] for p in paths] == [
+        "map 2020.svg",
+        "map 2021.svg",
+        "map 2022.svg",
+    ]
+    styles = [
+        ET.parse(path).getroot().find(f"{{{SVG_NS}}}style").text
+        for path in paths
+    ]
+    # The template's own fill rule for the countries' group is dropped
+    assert styles[0] == (
+        "\n    #bb {fill:#high}\n    #aa {fill:#low}\n    #cc {fill:#none}\n  "
+    )
+    assert "#aa,#bb,#cc {fill:#none}" in styles[1]
+    assert ">2021</tspan>" in open(paths[1]).read()
+
+
+def test_animation(tmp_path):
+    series = _series(tmp_path)
+    output = tmp_path / "animation.svg"
+
+    series.write_animation(str(output), label=YearLabel(x=10, y=20))
+
+    root = ET.parse(output).getroot()
+    fills = {
+        element.get("href"): element.get("values").split(";")
+        for element in root.iter(ANIMATE)
+        if element.get("attributeName") == "fill"
+    }
+    assert fills == {
+        "#aa": ["#low", "#c0c0c0", "#high"],
+        "#bb": ["#high", "#c0c0c0", "#c0c0c0"],
+        "#cc": ["#c0c0c0", "#c0c0c0", "#c0c0c0"],
+    }
+    labels = [
+        element.get("values").split(";")
+        for element in root.iter(ANIMATE)
+        if element.get("attributeName") == "visibility"
+    ]
+    assert labels == [
+        ["visible", "hidden", "hidden"],
+        ["hidden", "visible", "hidden"],
+        ["hidden", "hidden", "visible"],
+    ]
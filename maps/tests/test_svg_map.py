@@ -0,0 +1,120 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from svg_map import SVG_NS, Legend, SvgMap
+
+# A hand-made map: its layout, namespaces and comments must survive renders
+TEMPLATE = """\
+<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg
+   width="60"
+   height="40"
+   xmlns="http://www.w3.org/2000/svg"
+   xmlns:svg="http://www.w3.org/2000/svg">
+  <style
+     id="style1">
+    #country {fill:#c0c0c0;stroke:#ffffff}
+    #aa { fill:#111111; } /* note: 1 */
+    #bb,#cc {fill:#222222}
+  </style>
+  <!-- drawn by hand -->
+  <g
+     id="country">
+    <path id="aa" d="M 0 0 H 10 V 10 z" />
+    <path id="bb" d="M 20 0 H 30 V 10 z" />
+    <path id="cc" d="M 40 0 H 50 V 10 z" />
+  </g>
+  <text
+     x="5"
+     y="30"><tspan
+       id="title">GDP &amp; more</tspan></text>
+  <g
+     id="legend">
+    <text><tspan id="label">≤ 10</tspan></text>
+  </g>
+</svg>
+"""
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "map.svg"
+    path.write_text(TEMPLATE, encoding="utf-8")
+    return path
+
+
+def _style(svg: str) -> str:
+    return ET.fromstring(svg.encode()).find(f"{{{SVG_NS}}}style").text
+
+
+def test_fills_replace_the_fill_rules(template):
+    svg = SvgMap(template).render(
+        {"aa": "#ff0000", "bb": "#ff0000", "cc": "#00ff00"}
+    )
+
+    assert _style(svg) == (
+        "\n    #country {fill:#c0c0c0;stroke:#ffffff}"
+        "\n    #cc {fill:#00ff00}"
+        "\n    #aa,#bb {fill:#ff0000}"
+        "\n  "
+    )
+
+
+def test_notes_follow_each_rule(template):
+    svg = SvgMap(template).render(
+        {"bb": "#ff0000", "aa": "#ff0000"}, notes={"aa": "note: 2"}
+    )
+
+    assert (
+        "    #bb {fill:#ff0000}\n    #aa {fill:#ff0000} /* note: 2 */\n"
+        in (_style(svg))
+    )
+
+
+def test_only_the_slots_change(template):
+    svg_map = SvgMap(template)
+
+    assert svg_map.render({}) == TEMPLATE.replace(
+        "    #aa { fill:#111111; } /* note: 1 */\n"
+        "    #bb,#cc {fill:#222222}\n",
+        "\n",
+    )
+
+    svg = svg_map.render({}, texts={"title": "GDP <2023>"})
+    assert '<tspan\n       id="title">GDP &lt;2023&gt;</tspan>' in svg
+    assert "<!-- drawn by hand -->" in svg
+    assert 'xmlns:svg="http://www.w3.org/2000/svg"' in svg
+
+
+def test_writing_over_the_template_is_idempotent(template):
+    fills = {"aa": "#ff0000", "cc": "#00ff00"}
+
+    SvgMap(template).write(template, fills, texts={"title": "GDP"})
+    written = template.read_bytes()
+    SvgMap(template).write(template, fills, texts={"title": "GDP"})
+
+    assert template.read_bytes() == written
+
+
+def test_unknown_ids_are_rejected(template):
+    svg_map = SvgMap(template)
+
+    with pytest.raises(KeyError, match="zz"):
+        svg_map.render({"zz": "#ff0000"})
+    with pytest.raises(KeyError, match="country"):
+        svg_map.render({}, texts={"country": "text"})
+
+
+def test_legend_and_overlay(template):
+    svg_map = SvgMap(template)
+
+    svg = svg_map.render({}, texts={"label": "≤ 20"}, overlay="<circle/>")
+    assert (
+        '<tspan id="label">≤ 20</tspan></text>\n  </g>\n<circle/></svg>'
+        in (svg)
+    )
+
+    svg = svg_map.render({}, legend=Legend([("#ff0000", "all")]))
+    assert "≤" not in svg
+    assert '<g id="legend"><rect' in svg
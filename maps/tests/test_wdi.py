@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pytest
+
+import wdi
+
+YEARS = ["2021", "2022", "2023"]
+
+
+# A file laid out like a WDI download: byte order mark, four lines of
+# preamble, CRLF line ends and a trailing comma on every line
+def _write_csv(path, rows, indicator="NY.GDP.PCAP.PP.CD"):
+    lines = [
+        '"Data Source","World Development Indicators",',
+        "",
+        '"Last Updated Date","2024-12-16",',
+        "",
+        '"Country Name","Country Code","Indicator Name","Indicator Code",'
+        + ",".join(f'"{year}"' for year in YEARS)
+        + ",",
+    ]
+    for name, code, values in rows:
+        lines.append(
+            f'"{name}","{code}","GDP per capita","{indicator}",'
+            + ",".join(f'"{value}"' for value in values)
+            + ","
+        )
+    path.write_bytes(("\ufeff" + "\r\n".join(lines) + "\r\n").encode())
+    return str(path)
+
+
+ROWS = [
+    ("Sweden", "SWE", ["60000.5", "62000", ""]),
+    ("Namibia", "NAM", ["10000", "", "11000"]),
+    ("Africa Eastern and Southern", "AFE", ["4000", "4100", "4200"]),
+]
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_load(tmp_path, cache):
+    path = _write_csv(tmp_path / "gdp.csv", ROWS)
+
+    df = wdi.load(path, cache=cache)
+
+    assert df.index.name == "Country Code"
+    assert df.index.tolist() == ["SWE", "NAM", "AFE"]
+    # No column for the trailing comma
+    assert df.columns.tolist() == YEARS
+    assert (df.dtypes == np.float32).all()
+    assert df.loc["SWE", "2021"] == np.float32(60000.5)
+    assert np.isnan(df.loc["SWE", "2023"])
+    assert df.attrs == {
+        "indicator": "NY.GDP.PCAP.PP.CD",
+        "name": "GDP per capita",
+    }
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_load_selected_years_and_countries(tmp_path, cache):
+    path = _write_csv(tmp_path / "gdp.csv", ROWS)
+
+    df = wdi.load(
+        path, years=[2023, 2021], countries=["NAM", "SWE"], cache=cache
+    )
+
+    assert df.columns.tolist() == ["2023", "2021"]
+    assert df.index.tolist() == ["SWE", "NAM"]
+
+    with pytest.raises(ValueError, match="no columns for 1999, 2024"):
+        wdi.load(path, years=[1999, 2023, 2024], cache=cache)
+
+
+def test_cache_is_rebuilt_when_the_csv_is_newer(tmp_path):
+    path = _write_csv(tmp_path / "gdp.csv", ROWS)
+    cache_path = tmp_path / "gdp.arrow"
+
+    assert wdi.load(path).loc["SWE", "2021"] == np.float32(60000.5)
+    assert cache_path.exists()
+
+    # A fresh cache is read, not the CSV
+    _write_csv(tmp_path / "gdp.csv", [("Sweden", "SWE", ["1", "2", "3"])])
+    os.utime(path, (0, 0))
+    assert wdi.load(path).loc["SWE", "2021"] == np.float32(60000.5)
+
+    # A newer CSV replaces it
+    later = cache_path.stat().st_mtime + 10
+    os.utime(path, (later, later))
+    assert wdi.load(path).loc["SWE", "2021"] == 1
+
+
+def test_load_many(tmp_path):
+    gdp = _write_csv(tmp_path / "gdp.csv", ROWS)
+    population = _write_csv(
+        tmp_path / "population.csv",
+        [("Sweden", "SWE", ["10.4", "10.5", "10.6"])],
+        indicator="SP.POP.TOTL",
+    )
+
+    df = wdi.load_many([gdp, population, gdp], years=[2022])
+
+    assert df.columns.tolist() == [
+        ("NY.GDP.PCAP.PP.CD", "2022"),
+        ("SP.POP.TOTL", "2022"),
+    ]
+    assert df.index.tolist() == ["SWE", "NAM", "AFE"]
+    assert df.loc["SWE", ("SP.POP.TOTL", "2022")] == np.float32(10.5)
+    assert np.isnan(df.loc["NAM", ("SP.POP.TOTL", "2022")])
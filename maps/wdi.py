@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+from pyarrow import feather
+
+# World Development Indicators CSVs as downloaded from the World Bank: four
+# lines of preamble, a byte order mark, one row per country or aggregate,
+# one column per year and an empty column after the last year
+PREAMBLE_ROWS = 4
+ENCODING = "utf-8-sig"
+ID_COLUMNS = ["Country Code", "Indicator Name", "Indicator Code"]
+
+
+# One indicator as a country × year float32 frame indexed by ISO 3166
+# alpha-3 code (World Bank aggregates such as "AFE" included), with year
+# columns named as in the file ("2023") and the indicator's code and name
+# in `attrs`. Only the requested years are parsed. With `cache`, the first
+# load keeps every year in a Feather file next to the CSV, which later
+# loads memory-map instead of parsing the CSV again until it changes.
+def load(
+    path: str,
+    years: Optional[Iterable] = None,
+    countries: Optional[Iterable[str]] = None,
+    cache: bool = True,
+) -> pd.DataFrame:
+    years = None if years is None else [str(year) for year in years]
+    cache_path = Path(path).with_suffix(".arrow")
+
+    if cache and not _is_fresh(cache_path, path):
+        _write_cache(_read_csv(path), cache_path)
+
+    if cache:
+        table = feather.read_table(cache_path, memory_map=True)
+        if years is not None:
+            _check_years(path, years, table.column_names)
+            table = table.select([*ID_COLUMNS, *years])
+        df = table.to_pandas()
+    else:
+        df = _read_csv(path, years)
+
+    df = df.set_index("Country Code")
+    if countries is not None:
+        df = df[df.index.isin(list(countries))]
+
+    if len(df):
+        df.attrs["indicator"] = df["Indicator Code"].iloc[0]
+        df.attrs["name"] = df["Indicator Name"].iloc[0]
+    return df.drop(columns=ID_COLUMNS[1:])
+
+
+# Several indicator files read in parallel, side by side: columns are
+# (indicator code, year) pairs and rows the union of their countries
+def load_many(
+    paths: Iterable[str],
+    years: Optional[Iterable] = None,
+    countries: Optional[Iterable[str]] = None,
+    cache: bool = True,
+) -> pd.DataFrame:
+    paths = list(dict.fromkeys(paths))
+    years = None if years is None else list(years)
+    countries = None if countries is None else list(countries)
+
+    with ThreadPoolExecutor() as pool:
+        frames = list(
+            pool.map(lambda path: load(path, years, countries, cache), paths)
+        )
+
+    return pd.concat(
+        {
+            df.attrs.get("indicator", path): df
+            for path, df in zip(paths, frames)
+        },
+        axis=1,
+    )
+
+
+def _read_csv(path: str, years: Optional[List[str]] = None) -> pd.DataFrame:
+    header = pd.read_csv(
+        path, skiprows=PREAMBLE_ROWS, nrows=0, encoding=ENCODING
+    ).columns
+    # The trailing comma on every line reads as an unnamed, empty column
+    available = [column for column in header if column.isdigit()]
+
+    if years is None:
+        years = available
+    _check_years(path, years, available)
+
+    return pd.read_csv(
+        path,
+        skiprows=PREAMBLE_ROWS,
+        encoding=ENCODING,
+        usecols=[*ID_COLUMNS, *years],
+        dtype={
+            **{column: str for column in ID_COLUMNS},
+            **{year: "float32" for year in years},
+        },
+        keep_default_na=False,
+        na_values={year: [""] for year in years},
+    )[[*ID_COLUMNS, *years]]
+
+
+def _check_years(path: str, years: List[str], available: List[str]):
+    missing = sorted(set(years) - set(available))
+    if missing:
+        raise ValueError(f"{path} has no columns for {', '.join(missing)}")
+
+
+def _is_fresh(cache_path: Path, path: str) -> bool:
+    try:
+        return os.path.getmtime(cache_path) >= os.path.getmtime(path)
+    except OSError:
+        return False
+
+
+def _write_cache(df: pd.DataFrame, cache_path: Path):
+    temp_path = cache_path.with_suffix(".tmp")
+    feather.write_feather(df, temp_path)
+    os.replace(temp_path, cache_path)
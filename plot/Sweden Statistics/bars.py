@@ -0,0 +1,47 @@
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+
+# Vertical bars as one compound path instead of a Rectangle per bar, for
+# long yearly series. Looks like ax.bar (centred bars, autoscaled axes,
+# no margin below the baseline) but draws and saves as a single element.
+def bar_series(
+    ax: Axes, x, height, width: float = 0.8, bottom: float = 0, **kwargs
+) -> PathPatch:
+    x = np.asarray(x, dtype=float)
+    height = np.asarray(height, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(height))
+    left = x[keep] - width / 2
+    right = left + width
+    top = bottom + height[keep]
+    base = np.full_like(left, bottom)
+
+    corners = np.stack(
+        [
+            np.column_stack([left, base]),
+            np.column_stack([right, base]),
+            np.column_stack([right, top]),
+            np.column_stack([left, top]),
+            np.column_stack([left, base]),
+        ],
+        axis=1,
+    )
+    codes = np.tile(
+        [Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY],
+        len(left),
+    )
+
+    # ax.bar fills with `color` and leaves edges off, while a PathPatch
+    # would stroke with `color` or, by default, in black
+    if "color" in kwargs:
+        kwargs["facecolor"] = kwargs.pop("color")
+    kwargs.setdefault("edgecolor", "none")
+
+    patch = PathPatch(Path(corners.reshape(-1, 2), codes), **kwargs)
+    patch.sticky_edges.y.append(bottom)
+    ax.add_patch(patch)
+    ax.update_datalim(corners.reshape(-1, 2))
+    ax.autoscale_view()
+    return patch
@@ -0,0 +1,78 @@
+import argparse
+import io
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+from matplotlib import pyplot as plt  # noqa: E402
+
+# Two yearly series, 1749-2023 by default, drawn with a Rectangle per bar
+# by ax.bar and as one compound path each by bars.bar_series: build time,
+# SVG and PNG save times, and the saved SVG's paths and size
+parser = argparse.ArgumentParser(description="Time bar_series against ax.bar")
+parser.add_argument(
+    "--tree",
+    default=str(Path(__file__).resolve().parent.parent),
+    help="directory to import bars from",
+)
+parser.add_argument("--first", type=int, default=1749)
+parser.add_argument("--last", type=int, default=2023)
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+
+sys.path.insert(0, args.tree)
+from bars import bar_series  # noqa: E402
+
+years = np.arange(args.first, args.last + 1)
+rng = np.random.default_rng(0)
+immigration = rng.integers(1_000, 150_000, len(years))
+emigration = -rng.integers(1_000, 80_000, len(years))
+
+
+def draw(bars):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars(ax, years, immigration, width=0.8, color="#4e79a7")
+    bars(ax, years, emigration, width=0.8, color="#e15759")
+    return fig
+
+
+def best(run) -> float:
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+print(f"{len(years)} years, two series, best of {args.repeat}")
+for name, bars in (("ax.bar", plt.Axes.bar), ("bar_series", bar_series)):
+    build = best(lambda: plt.close(draw(bars)))
+    fig = draw(bars)
+    saves = {}
+    for file_format in ("svg", "png"):
+        saves[file_format] = best(
+            lambda: fig.savefig(io.BytesIO(), format=file_format)
+        )
+
+    svg = io.BytesIO()
+    fig.savefig(svg, format="svg")
+    paths = sum(
+        1
+        for element in ET.fromstring(svg.getvalue()).iter()
+        if element.tag.endswith("}path")
+    )
+    print(
+        f"{name}: {len(fig.axes[0].patches)} patches, "
+        f"build {build * 1000:.1f}ms, "
+        f"SVG save {saves['svg'] * 1000:.1f}ms, "
+        f"PNG save {saves['png'] * 1000:.1f}ms, "
+        f"SVG {paths} <path>s, {len(svg.getvalue()) / 1024:.1f} KiB"
+    )
+    plt.close(fig)
@@ -0,0 +1,50 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from mock_pxweb import table_metadata, table_response
+
+# Decoding a synthetic MIGRATION_BIRTH_COUNTRY-shaped json response with
+# StatisticsSweden._transform_data. Point --tree at a worktree of an older
+# commit to compare, e.g.
+#   git worktree add /tmp/baseline <commit>
+#   python bench_decode.py --tree "/tmp/baseline/plot/Sweden Statistics"
+parser = argparse.ArgumentParser(description="Time the json decoder")
+parser.add_argument(
+    "--tree",
+    default=str(Path(__file__).resolve().parent.parent),
+    help="directory to import statistics_sweden from",
+)
+parser.add_argument(
+    "--countries",
+    type=int,
+    default=2500,
+    help="countries of birth; rows are 48 per country (default: 2500)",
+)
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+
+sys.path.insert(0, args.tree)
+from statistics_sweden import StatisticsSweden  # noqa: E402
+
+metadata = table_metadata(countries=args.countries)
+response = table_response(metadata)
+print(f"{len(response['data']):,} rows")
+
+timings = []
+for _ in range(args.repeat):
+    start = time.perf_counter()
+    df = StatisticsSweden._transform_data(response, metadata)
+    timings.append(time.perf_counter() - start)
+
+tracemalloc.start()
+StatisticsSweden._transform_data(response, metadata)
+peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+
+print(f"decode: {min(timings):.2f}s (best of {args.repeat})")
+print(f"traced peak: {peak / 1e6:.1f}MB")
+print(f"frame: {df.memory_usage(deep=True).sum() / 1e6:.1f}MB")
+print(df.dtypes.to_string())
@@ -0,0 +1,57 @@
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+from mock_pxweb import MockPxWeb, isolated, table_metadata
+
+# Fetching and decoding one table as json and as json-stat2 from a local
+# mock server, from empty caches each time: the response body size, the
+# time get_dataframe takes, and whether both formats give the same frame
+parser = argparse.ArgumentParser(description="Compare json and json-stat2")
+parser.add_argument(
+    "--tree",
+    default=str(Path(__file__).resolve().parent.parent),
+    help="directory to import statistics_sweden from",
+)
+parser.add_argument(
+    "--countries",
+    type=int,
+    default=900,
+    help="countries of birth; rows are 48 per country (default: 900)",
+)
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+
+sys.path.insert(0, args.tree)
+from statistics_sweden import StatisticsSweden  # noqa: E402
+
+ENDPOINT = StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY
+metadata = table_metadata(countries=args.countries)
+# A fallback to json would time json twice
+warnings.filterwarnings("error", message="json-stat2 request failed")
+
+frames = {}
+with MockPxWeb(metadata) as server:
+    for response_format in StatisticsSweden.RESPONSE_FORMATS:
+        timings = []
+        for _ in range(args.repeat):
+            with isolated(StatisticsSweden, server):
+                client = StatisticsSweden()
+                client._get_metadata(ENDPOINT)
+                sent = server.stats["bytes"]
+                start = time.perf_counter()
+                frames[response_format], _ = client.get_dataframe(
+                    ENDPOINT, response_format=response_format
+                )
+                timings.append(time.perf_counter() - start)
+                size = server.stats["bytes"] - sent
+
+        print(
+            f"{response_format}: {size / 1e6:.2f}MB body, "
+            f"{min(timings):.2f}s fetch and decode (best of {args.repeat})"
+        )
+
+print(f"{len(frames['json']):,} rows")
+print("identical frames:", frames["json"].equals(frames["json-stat2"]))
@@ -0,0 +1,61 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+from mock_pxweb import MockPxWeb, isolated, table_metadata
+
+# Uncached metadata requests through module-level requests calls, which
+# open a connection per call, and through the client's pooled session,
+# against a mock server charging `--connect-cost` per new connection as a
+# stand-in for TCP and TLS setup. Then a 503 that the session retries.
+parser = argparse.ArgumentParser(description="Time the pooled session")
+parser.add_argument(
+    "--tree",
+    default=str(Path(__file__).resolve().parent.parent),
+    help="directory to import statistics_sweden from",
+)
+parser.add_argument("--requests", type=int, default=200)
+parser.add_argument("--connect-cost", type=float, default=0.03)
+args = parser.parse_args()
+
+sys.path.insert(0, args.tree)
+from statistics_sweden import StatisticsSweden  # noqa: E402
+
+metadata = table_metadata(countries=10)
+
+with (
+    MockPxWeb(metadata, connect_cost=args.connect_cost) as server,
+    isolated(StatisticsSweden, server),
+):
+    client = StatisticsSweden()
+
+    def module_level():
+        requests.get(server.url, timeout=None).raise_for_status()
+
+    def pooled():
+        with client.session.cache_disabled():
+            response = client.session.get(server.url, timeout=client.timeout)
+        response.raise_for_status()
+
+    print(
+        f"{args.requests} requests, {args.connect_cost * 1000:g}ms "
+        "per new connection"
+    )
+    for name, get in (("module-level", module_level), ("pooled", pooled)):
+        connections = server.stats["connections"]
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            get()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name}: {elapsed:.2f}s, "
+            f"{server.stats['connections'] - connections} connections"
+        )
+
+    gets = server.stats["GET"]
+    server.fail_next(503)
+    pooled()
+    print(f"503 then 200: {server.stats['GET'] - gets} requests, no error")
@@ -0,0 +1,51 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from mock_pxweb import MockPxWeb, cell_count, isolated, table_metadata
+
+# Fetching a table that is over the PxWeb cell limit, which the client
+# splits into chunks and posts from its thread pool, against a local mock
+# server with a lowered limit and a fixed latency per response
+parser = argparse.ArgumentParser(description="Time split queries")
+parser.add_argument(
+    "--tree",
+    default=str(Path(__file__).resolve().parent.parent),
+    help="directory to import statistics_sweden from",
+)
+parser.add_argument("--countries", type=int, default=450)
+parser.add_argument("--max-cells", type=int, default=5000)
+parser.add_argument("--latency", type=float, default=0.2)
+args = parser.parse_args()
+
+sys.path.insert(0, args.tree)
+from statistics_sweden import StatisticsSweden  # noqa: E402
+
+metadata = table_metadata(countries=args.countries)
+StatisticsSweden.MAX_CELLS = args.max_cells
+print(
+    f"{cell_count(metadata):,} cells, limit {args.max_cells:,}, "
+    f"{args.latency:g}s per response"
+)
+
+workers = StatisticsSweden.MAX_WORKERS
+for StatisticsSweden.MAX_WORKERS in (workers, 1):
+    with (
+        MockPxWeb(
+            metadata, max_cells=args.max_cells, latency=args.latency
+        ) as server,
+        isolated(StatisticsSweden, server),
+    ):
+        client = StatisticsSweden()
+        start = time.perf_counter()
+        df, _ = client.get_dataframe(
+            StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY,
+            {"Fodelseland": metadata["variables"][0]["values"]},
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"MAX_WORKERS={StatisticsSweden.MAX_WORKERS}: {elapsed:.2f}s, "
+            f"{len(df):,} rows in {server.stats['POST']} posts, "
+            f"{server.stats['rejected']} rejected"
+        )
@@ -0,0 +1,63 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from mock_pxweb import table_metadata, table_response
+
+# Decoding a synthetic 120k-row response body with json.loads and
+# _transform_data, as get_dataframe does by default, and with the
+# streaming decoder used for stream=True, fed 64KB at a time
+parser = argparse.ArgumentParser(description="Time the streaming decoder")
+parser.add_argument(
+    "--tree",
+    default=str(Path(__file__).resolve().parent.parent),
+    help="directory to import statistics_sweden from",
+)
+parser.add_argument("--countries", type=int, default=2500)
+parser.add_argument("--chunk-size", type=int, default=1 << 16)
+args = parser.parse_args()
+
+sys.path.insert(0, args.tree)
+from statistics_sweden import StatisticsSweden  # noqa: E402
+
+metadata = table_metadata(countries=args.countries)
+response = table_response(metadata)
+rows = len(response["data"])
+body = json.dumps(response).encode()
+del response
+print(f"{rows:,} rows, {len(body) / 1e6:.1f}MB body")
+
+
+def parsed():
+    return StatisticsSweden._transform_data(json.loads(body), metadata)
+
+
+def streamed():
+    chunks = (
+        body[start : start + args.chunk_size]
+        for start in range(0, len(body), args.chunk_size)
+    )
+    return StatisticsSweden._stream_transform(chunks, metadata, rows)[0]
+
+
+frames = {}
+for name, decode in (("json", parsed), ("stream", streamed)):
+    start = time.perf_counter()
+    frames[name] = decode()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    decode()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    size = frames[name].memory_usage(deep=True).sum()
+    print(
+        f"{name}: {elapsed:.2f}s, traced peak {peak / 1e6:.1f}MB, "
+        f"frame {size / 1e6:.1f}MB"
+    )
+
+print("identical frames:", frames["json"].equals(frames["stream"]))
@@ -0,0 +1,332 @@
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+SOURCE = "Statistics Sweden"
+UPDATED = "2024-02-21T08:00:00"
+
+
+# Metadata of a synthetic table shaped like MIGRATION_BIRTH_COUNTRY: country
+# of birth × sex × year, with immigration and emigration counts
+def table_metadata(
+    countries: int = 250, years: Iterable[int] = range(2000, 2024)
+) -> Dict:
+    codes = [f"C{i:04d}" for i in range(countries)]
+    years = [str(year) for year in years]
+    return {
+        "title": "Immigrations and emigrations by country of birth",
+        "variables": [
+            {
+                "code": "Fodelseland",
+                "text": "country of birth",
+                "values": codes,
+                "valueTexts": [f"Country {code}" for code in codes],
+                "elimination": True,
+            },
+            {
+                "code": "Kon",
+                "text": "sex",
+                "values": ["1", "2"],
+                "valueTexts": ["men", "women"],
+                "elimination": True,
+            },
+            {
+                "code": "ContentsCode",
+                "text": "observations",
+                "values": ["BE0101AX", "BE0101AY"],
+                "valueTexts": ["Immigrations", "Emigrations"],
+            },
+            {
+                "code": "Tid",
+                "text": "year",
+                "values": years,
+                "valueTexts": years,
+                "time": True,
+            },
+        ],
+    }
+
+
+# The json response PxWeb gives for `query` against `metadata`. Eliminated
+# variables are left out and a query without a value list selects them all.
+# Counts are derived from the keys, so every run sees the same numbers.
+def table_response(
+    metadata: dict, query: Optional[dict] = None, updated: str = UPDATED
+) -> Dict:
+    dimensions = _selected_dimensions(metadata, query)
+    keys = [(var, values) for var, values in dimensions if not _contents(var)]
+    contents = next(values for var, values in dimensions if _contents(var))
+
+    data = []
+    for key in itertools.product(*(values for _, values in keys)):
+        data.append(
+            {
+                "key": list(key),
+                "values": [_count(key, code) for code in contents],
+            }
+        )
+
+    columns = [
+        {
+            "code": var["code"],
+            "text": var["text"],
+            "type": "t" if var.get("time") else "d",
+        }
+        for var, _ in keys
+    ]
+    contents_var = next(var for var, _ in dimensions if _contents(var))
+    texts = dict(zip(contents_var["values"], contents_var["valueTexts"]))
+    columns += [
+        {"code": code, "text": texts[code], "type": "c"} for code in contents
+    ]
+
+    return {
+        "columns": columns,
+        "comments": [],
+        "data": data,
+        "metadata": [
+            {
+                "infofile": "BE0101",
+                "updated": updated,
+                "label": metadata["title"],
+                "source": SOURCE,
+            }
+        ],
+    }
+
+
+# The same response in json-stat2: one dense value array laid out row-major
+# over the selected dimensions, contents included, in metadata order. Like
+# PxWeb, it reports `updated` in UTC where json gives Swedish local time.
+def table_json_stat(
+    metadata: dict, query: Optional[dict] = None, updated: str = UPDATED
+) -> Dict:
+    dimensions = _selected_dimensions(metadata, query)
+
+    metric = next(i for i, (var, _) in enumerate(dimensions) if _contents(var))
+
+    value = []
+    for cell in itertools.product(*(values for _, values in dimensions)):
+        key = cell[:metric] + cell[metric + 1 :]
+        value.append(int(_count(key, cell[metric])))
+
+    return {
+        "version": "2.0",
+        "class": "dataset",
+        "label": metadata["title"],
+        "source": SOURCE,
+        "updated": _utc(updated),
+        "id": [var["code"] for var, _ in dimensions],
+        "size": [len(values) for _, values in dimensions],
+        "dimension": {
+            var["code"]: {
+                "label": var["text"],
+                "category": {
+                    "index": {code: i for i, code in enumerate(values)},
+                    "label": dict(zip(var["values"], var["valueTexts"])),
+                },
+            }
+            for var, values in dimensions
+        },
+        "role": {
+            "time": [var["code"] for var, _ in dimensions if var.get("time")],
+            "metric": [var["code"] for var, _ in dimensions if _contents(var)],
+        },
+        "value": value,
+        "extension": {"px": {"infofile": "BE0101"}},
+    }
+
+
+def cell_count(metadata: dict, query: Optional[dict] = None) -> int:
+    count = 1
+    for _, values in _selected_dimensions(metadata, query):
+        count *= len(values)
+    return count
+
+
+# A local stand-in for api.scb.se serving one table at every path: GET
+# returns the metadata and POST a query's json or json-stat2 response,
+# whichever the query asks for. Queries over `max_cells` are refused with
+# 403.
+# `latency` is added to every response and `connect_cost` once per new
+# connection, standing in for TCP and TLS setup. `release()` publishes a
+# new version of the table, `fail_next()` queues error statuses,
+# `requests` logs the time and method of every request received and
+# `queries` the body of every POST. `stats` counts requests by method,
+# rejected queries, connections and response body bytes.
+class MockPxWeb:
+
+    def __init__(
+        self,
+        metadata: Optional[dict] = None,
+        max_cells: int = 150_000,
+        latency: float = 0.0,
+        connect_cost: float = 0.0,
+        updated: str = UPDATED,
+    ):
+        self.metadata = metadata or table_metadata()
+        self.max_cells = max_cells
+        self.latency = latency
+        self.connect_cost = connect_cost
+        self.updated = updated
+        self.stats = Counter()
+        self.requests: List[Tuple[float, str]] = []
+        self.queries: List[dict] = []
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    def release(self, metadata: dict, updated: str):
+        with self._lock:
+            self.metadata = metadata
+            self.updated = updated
+
+    def fail_next(self, *statuses: int):
+        with self._lock:
+            self._failures.extend(statuses)
+
+    def start(self) -> "MockPxWeb":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockPxWeb":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _respond(self, method: str, query: Optional[dict]):
+        with self._lock:
+            self.stats[method] += 1
+            self.requests.append((time.monotonic(), method))
+            if query is not None:
+                self.queries.append(query)
+            if self._failures:
+                return self._failures.pop(0), {"error": "mock failure"}
+            metadata, updated = self.metadata, self.updated
+
+        time.sleep(self.latency)
+        if method == "GET":
+            return 200, metadata
+        if cell_count(metadata, query) > self.max_cells:
+            with self._lock:
+                self.stats["rejected"] += 1
+            return 403, {"error": "Too many cells selected"}
+        if query.get("response", {}).get("format") == "json-stat2":
+            return 200, table_json_stat(metadata, query, updated)
+        return 200, table_response(metadata, query, updated)
+
+
+# Points `client_class` (StatisticsSweden) at `server` and works from a
+# fresh temporary directory, so the HTTP, metadata and dataset caches, kept
+# at ../../ of the working directory, start empty and are thrown away
+@contextmanager
+def isolated(client_class, server: MockPxWeb):
+    base_url, cwd = client_class.BASE_URL, os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        work = Path(root, "plot", "Sweden Statistics")
+        work.mkdir(parents=True)
+        os.chdir(work)
+        client_class.BASE_URL = server.url
+        try:
+            yield Path(root)
+        finally:
+            client_class.BASE_URL = base_url
+            os.chdir(cwd)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle's algorithm
+    # the body would wait on the client's delayed ACK on kept-alive
+    # connections
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        mock = self.server.mock
+        with mock._lock:
+            mock.stats["connections"] += 1
+        time.sleep(mock.connect_cost)
+
+    def do_GET(self):
+        self._send(*self.server.mock._respond("GET", None))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._send(*self.server.mock._respond("POST", json.loads(body)))
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        mock = self.server.mock
+        with mock._lock:
+            mock.stats["bytes"] += len(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _selected_dimensions(metadata: dict, query: Optional[dict]) -> List:
+    selections = {
+        field["code"]: field["selection"]
+        for field in (query or {}).get("query", [])
+    }
+    dimensions = []
+    for var in metadata["variables"]:
+        selection = selections.get(var["code"])
+        if selection is None:
+            if var.get("elimination") and query is not None:
+                continue
+            dimensions.append((var, var["values"]))
+        elif selection["filter"] == "item":
+            known = set(var["values"])
+            values = [value for value in selection["values"] if value in known]
+            dimensions.append((var, values))
+        else:
+            dimensions.append((var, var["values"]))
+    return dimensions
+
+
+def _utc(updated: str) -> str:
+    local = datetime.fromisoformat(updated).replace(
+        tzinfo=ZoneInfo("Europe/Stockholm")
+    )
+    return local.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _contents(var: dict) -> bool:
+    return var["code"] == "ContentsCode"
+
+
+def _count(key: tuple, code: str) -> str:
+    return str(zlib.crc32("/".join((*key, code)).encode()) % 10_000)
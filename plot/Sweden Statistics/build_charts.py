@@ -0,0 +1,280 @@
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from dataclasses import fields, is_dataclass
+from functools import partial
+from typing import Dict, List, Tuple
+
+import matplotlib
+import pandas as pd
+
+from charts import Chart
+from raster_export import export_thumbnails, thumbnail_paths
+from statistics_sweden import StatisticsSweden
+from svg_optimize import optimize_svg
+
+CHART_MODULES = (
+    "sweden_migration",
+    "sweden_migration_by_country",
+    "sweden_migration_full_history",
+    "sweden_population_se_born",
+)
+
+MANIFEST_FILE = "build_manifest.json"
+
+# Resolved per process, so they would make every chart look changed
+VOLATILE_RC_PARAMS = {"backend", "backend_fallback", "interactive"}
+
+
+def discover_charts(modules=CHART_MODULES) -> List[Chart]:
+    return [
+        chart
+        for module in modules
+        for chart in importlib.import_module(module).CHARTS
+    ]
+
+
+def fetch_datasets(charts: List[Chart], client=None) -> Dict[str, tuple]:
+    datasets = {
+        dataset.key: dataset for chart in charts for dataset in chart.datasets
+    }
+    client = client or StatisticsSweden()
+
+    with ThreadPoolExecutor(max_workers=client.MAX_WORKERS) as pool:
+        frames = pool.map(
+            lambda dataset: dataset.fetch(client), datasets.values()
+        )
+        return dict(zip(datasets, frames))
+
+
+def fingerprint(chart: Chart, data_hashes: Dict[str, str]) -> str:
+    # Everything the output depends on: the data, the source of the module
+    # drawing it (plot helpers and TRANSLATIONS included) and of the local
+    # modules it uses, any arguments bound to the render function and the
+    # rcParams it renders under
+    render, arguments = chart.render, None
+    if isinstance(render, partial):
+        render, arguments = render.func, [render.args, render.keywords]
+
+    with matplotlib.rc_context():
+        if chart.configure:
+            chart.configure()
+        rc_params = {
+            key: repr(value)
+            for key, value in matplotlib.rcParams.items()
+            if key not in VOLATILE_RC_PARAMS
+        }
+
+    # Functions among the arguments (a chart spec's transforms, say) count
+    # by name and by the source of their module, not by memory address
+    modules = {render.__module__}
+
+    def describe(value):
+        if isinstance(value, partial):
+            return [value.func, value.args, value.keywords]
+        if is_dataclass(value):
+            return {f.name: getattr(value, f.name) for f in fields(value)}
+        if inspect.isfunction(value):
+            modules.add(value.__module__)
+            return f"{value.__module__}.{value.__qualname__}"
+        return repr(value)
+
+    settings = json.dumps(
+        [chart.outputs, arguments, rc_params], sort_keys=True, default=describe
+    )
+
+    digest = hashlib.sha256()
+    for dataset in chart.datasets:
+        digest.update(data_hashes[dataset.key].encode())
+    for name in sorted(modules):
+        for source in _module_sources(sys.modules[name]):
+            digest.update(source.encode())
+    digest.update(settings.encode())
+    return digest.hexdigest()
+
+
+def data_hash(df: pd.DataFrame, metadata: list) -> str:
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df).values.tobytes())
+    digest.update(
+        json.dumps(
+            [list(map(str, df.columns)), list(map(str, df.dtypes)), metadata],
+            sort_keys=True,
+        ).encode()
+    )
+    return digest.hexdigest()
+
+
+def render_chart(
+    chart: Chart, frames: list, thumbnails: Tuple[int, ...] = ()
+) -> Dict[str, float]:
+    from matplotlib import pyplot as plt
+
+    timings = {}
+    # Charts set their own rcParams; keep them from leaking into the next
+    # chart rendered by the same worker
+    with plt.rc_context():
+        if chart.configure:
+            chart.configure()
+
+        start = time.perf_counter()
+        for output, fig in chart.figures(frames):
+            fig.savefig(output, dpi=150, bbox_inches="tight")
+            if output.endswith(".svg"):
+                optimize_svg(output)
+            export_thumbnails(fig, output, thumbnails)
+            plt.close(fig)
+            timings[output] = time.perf_counter() - start
+            start = time.perf_counter()
+
+    return timings
+
+
+def build(
+    charts: List[Chart] = None,
+    workers: int = None,
+    force: bool = False,
+    thumbnails: Tuple[int, ...] = (),
+):
+    start = time.perf_counter()
+    charts = discover_charts() if charts is None else charts
+
+    frames = fetch_datasets(charts)
+    fetched = time.perf_counter()
+
+    data_hashes = {key: data_hash(*frame) for key, frame in frames.items()}
+    manifest = _load_manifest()
+    fingerprints = {
+        chart.output: fingerprint(chart, data_hashes) for chart in charts
+    }
+    stale = [
+        chart
+        for chart in charts
+        if force
+        or any(
+            manifest.get(output) != fingerprints[chart.output]
+            for output in chart.outputs
+        )
+        or not all(map(os.path.exists, _files(chart, thumbnails)))
+    ]
+
+    # A chart that fails doesn't stop the others, and the manifest still
+    # records every chart that rendered; the failures are raised at the end
+    timings = {}
+    failures = {}
+    if stale:
+        with ProcessPoolExecutor(
+            max_workers=min(workers or os.cpu_count(), len(stale)),
+            initializer=_init_worker,
+        ) as pool:
+            futures = {
+                pool.submit(
+                    render_chart,
+                    chart,
+                    [frames[dataset.key] for dataset in chart.datasets],
+                    thumbnails,
+                ): chart
+                for chart in stale
+            }
+            for future in as_completed(futures):
+                chart = futures[future]
+                try:
+                    timings.update(future.result())
+                except Exception as e:
+                    e.add_note(f"Rendering {', '.join(chart.outputs)}")
+                    failures[chart.output] = e
+                    continue
+                for output in chart.outputs:
+                    manifest[output] = fingerprints[chart.output]
+
+        _write_manifest(manifest)
+
+    finished = time.perf_counter()
+    failed = sum(
+        len(chart.outputs) for chart in charts if chart.output in failures
+    )
+    _print_summary(
+        timings,
+        sum(len(chart.outputs) for chart in charts) - len(timings) - failed,
+        failed,
+        fetched - start,
+        finished - fetched,
+    )
+    if failures:
+        raise ExceptionGroup(
+            f"{len(failures)} of {len(stale)} charts failed to render",
+            list(failures.values()),
+        )
+
+
+def _files(chart: Chart, thumbnails: Tuple[int, ...]) -> List[str]:
+    return [
+        path
+        for output in chart.outputs
+        for path in [output, *thumbnail_paths(output, thumbnails)]
+    ]
+
+
+def _module_sources(module) -> List[str]:
+    directory = os.path.dirname(module.__file__)
+    modules = {module.__name__: module}
+    for value in vars(module).values():
+        name = value.__name__ if inspect.ismodule(value) else None
+        dependency = sys.modules.get(name or getattr(value, "__module__", ""))
+        path = getattr(dependency, "__file__", None)
+        if path and os.path.dirname(path) == directory:
+            modules[dependency.__name__] = dependency
+
+    return [inspect.getsource(modules[name]) for name in sorted(modules)]
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _load_manifest() -> Dict[str, str]:
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: Dict[str, str]):
+    temp_path = f"{MANIFEST_FILE}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, MANIFEST_FILE)
+
+
+def _print_summary(
+    timings: Dict[str, float],
+    skipped: int,
+    failed: int,
+    fetch: float,
+    render: float,
+):
+    width = max(map(len, timings), default=0)
+    for output, seconds in sorted(timings.items(), key=lambda t: -t[1]):
+        print(f"{output:<{width}}  {seconds:6.2f}s")
+
+    print(
+        f"{len(timings)} files rendered, {skipped} unchanged, "
+        f"{failed} failed: "
+        f"fetch {fetch:.2f}s, render {render:.2f}s "
+        f"(sum of charts {sum(timings.values()):.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    build(force="--force" in sys.argv[1:])
@@ -0,0 +1,182 @@
+import math
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+from matplotlib import pyplot as plt
+from matplotlib.patches import Patch
+
+from charts import Chart, Dataset, LocalizedChart
+from footer import format_footer
+
+
+# Categories sharing one colour and one legend entry; the label is looked up
+# in the spec's text so that it can be translated
+@dataclass(frozen=True)
+class ColourGroup:
+    label: str
+    colour: str
+    members: Tuple[str, ...]
+
+
+# A chart written down as data: the dataset it is drawn from, the transforms
+# turning that DataFrame into what `kind` plots, the colours, and the text in
+# every language (title, labels, legend entries and footer words). An output
+# name holding {lang} makes one file per language in `text`.
+# Transforms and `configure` must be module-level functions (or partials of
+# them) so that compiled charts pickle. A spec is checked when it is
+# written down, so a broken one fails on import rather than in a worker.
+@dataclass(frozen=True)
+class ChartSpec:
+    output: str
+    dataset: Dataset
+    kind: str
+    text: Dict[str, Dict[str, str]]
+    transforms: Tuple[Callable, ...] = ()
+    groups: Tuple[ColourGroup, ...] = ()
+    options: dict = field(default_factory=dict)
+    configure: Callable = None
+
+    def __post_init__(self):
+        if self.kind not in RENDERERS:
+            raise ValueError(
+                f"{self.output}: unknown kind {self.kind!r}, "
+                f"expected one of {', '.join(RENDERERS)}"
+            )
+        if not self.text:
+            raise ValueError(f"{self.output}: no text in any language")
+        if len(self.text) > 1 and "{lang}" not in self.output:
+            raise ValueError(
+                f"{self.output}: text in {len(self.text)} languages needs "
+                "an output name with a {lang} field"
+            )
+        for lang, text in self.text.items():
+            missing = [
+                key for key in REQUIRED_TEXT[self.kind] if key not in text
+            ]
+            if missing:
+                raise ValueError(
+                    f"{self.output}: no {', '.join(missing)} in {lang!r} text"
+                )
+
+
+# Horizontal bars of percentage shares, largest at the top, each labelled
+# with its value. Labels go inside the bar in white, except for categories
+# left out of the "labels_inside" option (when given), which get a black
+# label just past the end of the bar.
+def share_bars(spec: ChartSpec, data, metadata):
+    colours = {
+        member: group.colour
+        for group in spec.groups
+        for member in group.members
+    }
+    inside = spec.options.get("labels_inside")
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    ax.barh(
+        data.index,
+        data.values,
+        color=[colours[category] for category in data.index],
+    )
+    ax.set_axisbelow(True)
+    ax.grid(axis="x", alpha=0.3)
+
+    title = ax.set_title("", pad=24, fontweight="bold")
+    subtitle = fig.text(
+        0.5,
+        1,
+        "",
+        ha="center",
+        transform=ax.transAxes,
+        va="bottom",
+        fontsize=14,
+    )
+
+    for i, (category, v) in enumerate(data.items()):
+        if inside is None or category in inside:
+            ax.text(
+                v - 0.1, i, f"{v:.1f}%", va="center", ha="right", color="white"
+            )
+        else:
+            ax.text(
+                v + 0.1, i, f"{v:.1f}%", va="center", ha="left", color="black"
+            )
+
+    ax.set_xlim(right=math.ceil(data.max()))
+
+    footer = fig.text(0, 0, "", wrap=True, ha="left", va="bottom", fontsize=10)
+
+    def localize(lang):
+        text = spec.text[lang]
+
+        title.set_text(text["title"])
+        subtitle.set_text(text.get("subtitle", ""))
+        ax.set_xlabel(text["x_label"])
+        ax.legend(
+            handles=[
+                Patch(
+                    facecolor=group.colour,
+                    label=text.get(group.label, group.label),
+                )
+                for group in spec.groups
+            ],
+            loc="lower right",
+        )
+        footer.set_text(_footer(metadata, lang, text))
+        _relayout(fig)
+
+    return fig, localize
+
+
+RENDERERS = {"share_bars": share_bars}
+# The text every language of a spec has to give, by kind
+REQUIRED_TEXT = {"share_bars": ("title", "x_label")}
+
+
+def render_spec(spec: ChartSpec, df, metadata):
+    data = df
+    for transform in spec.transforms:
+        data = transform(data)
+
+    fig, localize = RENDERERS[spec.kind](spec, data, metadata)
+    if "{lang}" in spec.output:
+        return fig, localize
+
+    localize(next(iter(spec.text)))
+    return fig
+
+
+# Specs become ordinary charts, so build_charts fetches each distinct
+# dataset once across specs and scripts alike and schedules their renders
+# together with everything else
+def compile_specs(specs: List[ChartSpec]) -> List[Chart]:
+    charts = []
+    for spec in specs:
+        chart = dict(
+            output=spec.output,
+            datasets=(spec.dataset,),
+            render=partial(render_spec, spec),
+            configure=spec.configure,
+        )
+        if "{lang}" in spec.output:
+            charts.append(LocalizedChart(**chart, languages=tuple(spec.text)))
+        else:
+            charts.append(Chart(**chart))
+    return charts
+
+
+def _footer(metadata: list, lang: str, text: Dict[str, str]) -> str:
+    words = {key: text[key] for key in ("source", "updated") if key in text}
+    return format_footer(metadata, lang, **words)
+
+
+def _relayout(fig):
+    # tight_layout starts from the current layout; reset it so every
+    # language is laid out as if drawn on a fresh figure
+    fig.subplots_adjust(
+        **{
+            side: plt.rcParams[f"figure.subplot.{side}"]
+            for side in ("left", "right", "bottom", "top")
+        }
+    )
+    fig.tight_layout(rect=[0, 0.02, 1, 1])
@@ -0,0 +1,63 @@
+import json
+from itertools import chain
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Tuple
+
+from statistics_sweden import StatisticsSweden
+
+
+# One get_dataframe call; charts asking for the same key share the result
+@dataclass(frozen=True)
+class Dataset:
+    endpoint: StatisticsSweden.Endpoint
+    fields: dict = None
+    aggregate: Tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        return json.dumps(
+            [self.endpoint.name, self.fields, list(self.aggregate)],
+            sort_keys=True,
+        )
+
+    def fetch(self, client: StatisticsSweden):
+        return client.get_dataframe(
+            self.endpoint, self.fields, aggregate=list(self.aggregate) or None
+        )
+
+
+# A chart renders one figure per output file, called with the DataFrame and
+# metadata of each of its datasets in turn: render(df, metadata, ...).
+# Everything here has to pickle, so `render` and `configure` must be
+# module-level functions (or partials of them).
+@dataclass(frozen=True)
+class Chart:
+    output: str
+    datasets: Tuple[Dataset, ...]
+    render: Callable
+    configure: Callable = None
+
+    @property
+    def outputs(self) -> List[str]:
+        return [self.output]
+
+    def figures(self, frames: list) -> Iterator[Tuple[str, object]]:
+        yield self.output, self.render(*chain.from_iterable(frames))
+
+
+# One chart in several languages. The output name holds a {lang} field, and
+# render returns the figure with a localize(lang) callback that swaps its
+# text, so the data is only drawn once for all the languages.
+@dataclass(frozen=True)
+class LocalizedChart(Chart):
+    languages: Tuple[str, ...] = ("en",)
+
+    @property
+    def outputs(self) -> List[str]:
+        return [self.output.format(lang=lang) for lang in self.languages]
+
+    def figures(self, frames: list) -> Iterator[Tuple[str, object]]:
+        fig, localize = self.render(*chain.from_iterable(frames))
+        for lang, output in zip(self.languages, self.outputs):
+            localize(lang)
+            yield output, fig
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from pyarrow import feather
+
+
+# Decoded tables stored as Arrow IPC (Feather) files, keyed by table path and
+# the normalized PxWeb query, so a warm start never touches the JSON
+# response. The files are lz4-compressed, so every load decompresses into
+# new buffers and memory-mapping them would save nothing. Entries are
+# dropped once they are older than `expire_after` or the table's `updated`
+# timestamp changes.
+class DatasetStore:
+
+    INDEX_FILE = "index.json"
+
+    def __init__(
+        self,
+        path: str = "../../dataset_cache",
+        expire_after: timedelta = timedelta(days=30),
+    ):
+        self._path = Path(path)
+        self._expire_after = expire_after
+        self._index = None
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(
+        self, table: str, query: dict, updated: Optional[str] = None
+    ) -> Optional[Tuple[pd.DataFrame, list]]:
+        key = self._key(table, query)
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            stale = updated is not None and entry["updated"] != updated
+            expired = (
+                datetime.now() - datetime.fromisoformat(entry["created"])
+                > self._expire_after
+            )
+            if stale or expired:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+                return None
+
+            df = self._read(key)
+            if df is None:
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+            return df, entry["metadata"]
+
+    def latest(
+        self, table: str, query: dict
+    ) -> Optional[Tuple[pd.DataFrame, list]]:
+        # The stored frame whatever its age, as a base for incremental updates
+        key = self._key(table, query)
+        with self._lock:
+            entry = self._load_index().get(key)
+            df = self._read(key) if entry is not None else None
+            return (df, entry["metadata"]) if df is not None else None
+
+    def put(self, table: str, query: dict, df: pd.DataFrame, metadata: list):
+        key = self._key(table, query)
+        file_name = f"{key}.arrow"
+        with self._lock:
+            self._path.mkdir(parents=True, exist_ok=True)
+            temp_path = self._path / f"{key}.tmp"
+            feather.write_feather(df.reset_index(drop=True), temp_path)
+            os.replace(temp_path, self._path / file_name)
+
+            index = self._load_index()
+            index[key] = {
+                "table": table,
+                "file": file_name,
+                "updated": metadata[0]["updated"],
+                "created": datetime.now().isoformat(),
+                "metadata": metadata,
+            }
+            self._write_index()
+
+    def _read(self, key: str) -> Optional[pd.DataFrame]:
+        try:
+            return feather.read_feather(
+                self._path / self._load_index()[key]["file"]
+            )
+        except (OSError, ValueError):
+            self._remove(key)
+            return None
+
+    def _remove(self, key: str):
+        entry = self._load_index().pop(key)
+        try:
+            os.remove(self._path / entry["file"])
+        except OSError:
+            pass
+        self._write_index()
+
+    def _load_index(self) -> Dict:
+        if self._index is None:
+            try:
+                with open(self._path / self.INDEX_FILE) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _write_index(self):
+        temp_path = self._path / f"{self.INDEX_FILE}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, self._path / self.INDEX_FILE)
+
+    @staticmethod
+    def _key(table: str, query: dict) -> str:
+        normalized = json.dumps([table, query], sort_keys=True)
+        return hashlib.sha256(normalized.encode()).hexdigest()[:32]
@@ -0,0 +1,29 @@
+from dateutil import parser
+
+# strftime("%b") for each language, spelled out so that dates can be
+# formatted without switching the process-wide locale
+MONTH_ABBREVIATIONS = {
+    "en": "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split(),
+    "pl": "sty lut mar kwi maj cze lip sie wrz paź lis gru".split(),
+    "sv": "jan feb mar apr maj jun jul aug sep okt nov dec".split(),
+}
+
+
+def format_date(date_str: str, lang: str = "en") -> str:
+    date = parser.isoparse(date_str)
+    month = MONTH_ABBREVIATIONS[lang][date.month - 1]
+    return f"{date.day} {month} {date.year}"
+
+
+def format_footer(
+    metadata: list,
+    lang: str = "en",
+    source: str = "Source",
+    updated: str = "Updated",
+) -> str:
+    return (
+        f"{source}: {metadata[0]['source']}"
+        f" - {metadata[0]['label']}"
+        f" ({metadata[0]['infofile']}) - "
+        f"{updated}: {format_date(metadata[0]['updated'], lang)}"
+    )
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Table metadata kept in an in-memory LRU on top of an on-disk index. Each
+# entry remembers the newest `updated` timestamp reported with the table's
+# data, so a newer release evicts the metadata describing the old one, and
+# responses from an older release are told apart from current ones.
+class MetadataStore:
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, path: str = "../../metadata_cache", size: int = 64):
+        self._path = Path(path)
+        self._size = size
+        self._memory = OrderedDict()
+        self._index = None
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(self, table: str, language: str) -> Optional[Dict]:
+        key = self._key(table, language)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+            entry = self._load_index().get(key)
+            if entry is not None and entry["file"] is not None:
+                try:
+                    with open(self._path / entry["file"]) as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    metadata = None
+
+                if metadata is not None:
+                    self._remember(key, metadata)
+                    self.stats["disk_hits"] += 1
+                    return metadata
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(
+        self,
+        table: str,
+        language: str,
+        metadata: dict,
+        updated: Optional[str] = None,
+    ):
+        key = self._key(table, language)
+        file_name = key.replace("/", "_") + ".json"
+        with self._lock:
+            self._path.mkdir(parents=True, exist_ok=True)
+            self._write_json(self._path / file_name, metadata)
+
+            index = self._load_index()
+            previous = index.get(key, {}).get("updated")
+            if previous is not None and (
+                updated is None or self._is_newer(previous, updated)
+            ):
+                updated = previous
+            index[key] = {"file": file_name, "updated": updated}
+            self._write_json(self._path / self.INDEX_FILE, index)
+            self._remember(key, metadata)
+
+    def validate(self, table: str, language: str, updated: str) -> bool:
+        # False when data reported as `updated` is from another release than
+        # the stored one. A newer release is recorded and drops the stored
+        # metadata; an older one (a stale response) changes nothing.
+        key = self._key(table, language)
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None or entry["updated"] == updated:
+                return True
+
+            if entry["updated"] is None:
+                entry["updated"] = updated
+                self._write_json(self._path / self.INDEX_FILE, index)
+                return True
+
+            if self._is_newer(updated, entry["updated"]):
+                entry["file"] = None
+                entry["updated"] = updated
+                self._memory.pop(key, None)
+                self._write_json(self._path / self.INDEX_FILE, index)
+                self.stats["invalidations"] += 1
+            else:
+                self.stats["stale_responses"] += 1
+            return False
+
+    def updated(self, table: str, language: str) -> Optional[str]:
+        with self._lock:
+            entry = self._load_index().get(self._key(table, language))
+            return entry["updated"] if entry else None
+
+    def _remember(self, key: str, metadata: dict):
+        self._memory[key] = metadata
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._size:
+            self._memory.popitem(last=False)
+
+    def _load_index(self) -> Dict:
+        if self._index is None:
+            try:
+                with open(self._path / self.INDEX_FILE) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    @staticmethod
+    def _is_newer(updated: str, than: str) -> bool:
+        try:
+            return datetime.fromisoformat(updated) > datetime.fromisoformat(
+                than
+            )
+        except (TypeError, ValueError):
+            return updated > than
+
+    @staticmethod
+    def _key(table: str, language: str) -> str:
+        return f"{language}/{table}"
+
+    @staticmethod
+    def _write_json(path: Path, data):
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
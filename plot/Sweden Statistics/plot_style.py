@@ -0,0 +1,83 @@
+import os
+import time
+import warnings
+from functools import cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import matplotlib
+from cycler import cycler
+from matplotlib import font_manager as fm
+
+from colours import BangWongColors
+
+# Searched in order; the first directory holding a font file wins
+FONT_DIR_VARIABLE = "CHART_FONT_DIR"
+BUNDLED_FONT_DIR = Path(__file__).parent / "fonts"
+USER_FONT_DIR = Path.home() / "Library" / "Fonts"
+
+FONT_FILES = ("LiberationSans-Regular.ttf", "LiberationSans-Bold.ttf")
+
+STYLE = {
+    "font.sans-serif": ["Liberation Sans"],
+    "svg.fonttype": "none",
+    "axes.prop_cycle": cycler(
+        color=[
+            BangWongColors.BLUE,
+            BangWongColors.ORANGE,
+            BangWongColors.GREEN,
+            BangWongColors.RED_ORANGE,
+            BangWongColors.LIGHT_BLUE,
+            BangWongColors.PINK,
+            BangWongColors.YELLOW,
+            BangWongColors.BLACK,
+        ]
+    ),
+}
+
+timings: Dict[str, float] = {}
+
+
+def apply_style(rc_params: dict = None):
+    configure_fonts()
+    matplotlib.rcParams.update(STYLE)
+    matplotlib.rcParams.update(rc_params or {})
+
+
+# addfont appends to the font list and clears matplotlib's lookup cache
+# every time, so fonts are registered once per process
+@cache
+def configure_fonts() -> Tuple[str, ...]:
+    start = time.perf_counter()
+    files = font_files()
+    for path in files:
+        fm.fontManager.addfont(path)
+
+    missing = set(FONT_FILES) - {os.path.basename(path) for path in files}
+    if missing:
+        warnings.warn(
+            f"{', '.join(sorted(missing))} not found; put them in "
+            f"{BUNDLED_FONT_DIR} or point {FONT_DIR_VARIABLE} at them"
+        )
+
+    timings["fonts"] = time.perf_counter() - start
+    return files
+
+
+def font_files() -> Tuple[str, ...]:
+    found = {}
+    for directory in font_dirs():
+        for name in FONT_FILES:
+            path = directory / name
+            if name not in found and path.is_file():
+                found[name] = str(path)
+    return tuple(found.values())
+
+
+def font_dirs() -> List[Path]:
+    configured = os.environ.get(FONT_DIR_VARIABLE, "")
+    return [
+        *(Path(path) for path in configured.split(os.pathsep) if path),
+        BUNDLED_FONT_DIR,
+        USER_FONT_DIR,
+    ]
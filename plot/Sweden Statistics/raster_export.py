@@ -0,0 +1,67 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List
+
+from matplotlib.figure import Figure
+from PIL import Image
+
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+
+
+def thumbnail_paths(
+    output: str, widths: Iterable[int], directory: str = THUMBNAIL_DIR
+) -> List[str]:
+    stem = Path(output).stem
+    return [
+        os.path.join(directory, f"{stem}-{width}px.png") for width in widths
+    ]
+
+
+# PNG previews of a figure at several pixel widths. The figure goes through
+# Agg once, at whatever resolution the widest preview needs (never below
+# `dpi`), and the other sizes are downsampled from that image in threads;
+# Pillow releases the GIL while resampling and encoding.
+def export_thumbnails(
+    fig: Figure,
+    output: str,
+    widths: Iterable[int] = THUMBNAIL_WIDTHS,
+    dpi: int = 150,
+    directory: str = THUMBNAIL_DIR,
+) -> List[str]:
+    widths = sorted(widths)
+    if not widths:
+        return []
+
+    # bbox_inches="tight" pads the cropped figure by 0.1in on every side
+    tight_width = fig.get_tightbbox().width + 0.2
+    master_dpi = max(dpi, widths[-1] / tight_width)
+
+    buffer = io.BytesIO()
+    fig.savefig(
+        buffer,
+        format="png",
+        dpi=master_dpi,
+        bbox_inches="tight",
+        pil_kwargs={"compress_level": 0},
+    )
+    buffer.seek(0)
+    master = Image.open(buffer)
+    master.load()
+
+    os.makedirs(directory, exist_ok=True)
+    paths = thumbnail_paths(output, widths, directory)
+
+    def save(width: int, path: str):
+        height = max(1, round(master.height * width / master.width))
+        image = master
+        if image.size != (width, height):
+            image = master.resize((width, height), Image.Resampling.LANCZOS)
+        image.save(path)
+
+    with ThreadPoolExecutor(max_workers=len(widths)) as pool:
+        list(pool.map(save, widths, paths))
+
+    return paths
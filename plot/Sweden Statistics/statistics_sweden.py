@@ -1,14 +1,46 @@
-from datetime import timedelta
+import copy
+import fnmatch
+import math
+import threading
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
+import ijson
+import numpy as np
 import pandas as pd
 import requests
 import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from dataset_store import DatasetStore
+from metadata_store import MetadataStore
 
 
 class StatisticsSweden:
-    BASE_URL = "https://api.scb.se/OV0104/v1/doris/en/ssd/"
+    LANGUAGE = "en"
+    BASE_URL = f"https://api.scb.se/OV0104/v1/doris/{LANGUAGE}/ssd/"
+
+    # PxWeb limits on api.scb.se: cells per query and calls per time window
+    MAX_CELLS = 150_000
+    MAX_CALLS = 30
+    CALL_PERIOD = 10
+    MAX_WORKERS = 4
+
+    POOL_SIZE = 10
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 120
+    RETRIES = 5
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    RESPONSE_FORMATS = ("json", "json-stat2")
+    TIME_ZONE = ZoneInfo("Europe/Stockholm")
 
     class Endpoint(Enum):
 
@@ -26,19 +58,266 @@ class StatisticsSweden:
         def url(self):
             return StatisticsSweden.BASE_URL + self.value
 
-    def __init__(self):
-        requests_cache.install_cache(
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        timeout: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+    ):
+        # One keep-alive connection pool for every call the client makes;
+        # requests already asks for gzip, and br when brotli is installed
+        self.session = requests_cache.CachedSession(
             cache_name="../../http_cache",
             backend="filesystem",
             expire_after=timedelta(days=30),
             allowable_methods=("GET", "POST"),
         )
+        retry = Retry(
+            total=self.RETRIES,
+            backoff_factor=1,
+            backoff_jitter=1,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = timeout
+
+        self._rate_limiter = _RateLimiter(self.MAX_CALLS, self.CALL_PERIOD)
+        self.metadata_store = MetadataStore()
+        self.dataset_store = DatasetStore()
 
     def get_dataframe(
-        self, endpoint: Endpoint, selected_fields: dict = None
+        self,
+        endpoint: Endpoint,
+        selected_fields: dict = None,
+        stream: bool = False,
+        response_format: str = "json",
+        aggregate: List[str] = None,
+        refresh: bool = False,
+    ) -> Tuple[pd.DataFrame, dict]:
+        # With `refresh`, metadata and data come from the server, past the
+        # HTTP cache and the stores
+        if response_format not in self.RESPONSE_FORMATS:
+            raise ValueError(f"Unsupported response format: {response_format}")
+
+        metadata = self._get_metadata(endpoint, refresh=refresh)
+        query = self._build_query(metadata, selected_fields)
+        reduce = []
+        if aggregate:
+            query, reduce = self._push_down(query, metadata, aggregate)
+
+        cached = None
+        if not refresh:
+            cached = self.dataset_store.get(
+                endpoint.url,
+                query,
+                self.metadata_store.updated(endpoint.value, self.LANGUAGE),
+            )
+        if cached is not None:
+            df, response_metadata = cached
+            return self._aggregate(df, metadata, reduce), response_metadata
+
+        df, response_metadata = self._fetch_all(
+            endpoint.url, query, metadata, stream, response_format, refresh
+        )
+
+        if (
+            not self.metadata_store.validate(
+                endpoint.value, self.LANGUAGE, response_metadata[0]["updated"]
+            )
+            and not refresh
+        ):
+            # The data and the stored metadata are from different releases
+            # of the table. Either may have come from the HTTP cache, so
+            # fetch both again from the server and rebuild the query, which
+            # may be missing values added by the new release.
+            return self.get_dataframe(
+                endpoint,
+                selected_fields,
+                stream,
+                response_format,
+                aggregate,
+                refresh=True,
+            )
+
+        self.dataset_store.put(endpoint.url, query, df, response_metadata)
+        return self._aggregate(df, metadata, reduce), response_metadata
+
+    def refresh_dataframe(
+        self,
+        endpoint: Endpoint,
+        selected_fields: dict = None,
+        overlap: int = 1,
     ) -> Tuple[pd.DataFrame, dict]:
+        # Fetch only the periods missing from the stored frame, plus the
+        # last `overlap` stored ones since SCB revises preliminary figures
+        metadata = self._get_metadata(endpoint, refresh=True)
+        time_variable = next(
+            (var for var in metadata["variables"] if var.get("time")), None
+        )
+        if time_variable is None or time_variable["code"] in (
+            selected_fields or {}
+        ):
+            return self.get_dataframe(endpoint, selected_fields)
+
+        query = self._build_query(metadata, selected_fields)
+        stored = self.dataset_store.latest(endpoint.url, query)
+        if stored is None:
+            df, response_metadata = self._fetch_all(
+                endpoint.url, query, metadata, refresh=True
+            )
+        else:
+            df = stored[0]
+            name = time_variable["text"].lower().replace(" ", "_")
+            periods = self._parse_periods(
+                name, np.array(time_variable["values"], dtype=object)
+            )
+            present = pd.Index(periods).isin(df[name].unique())
+            codes = np.array(time_variable["values"], dtype=object)
+            fetch_codes = list(codes[present][-overlap:] if overlap else [])
+            fetch_codes += list(codes[~present])
+            if not fetch_codes:
+                return stored
+
+            period_query = copy.deepcopy(query)
+            period_query["query"] = [
+                field
+                for field in period_query["query"]
+                if field["code"] != time_variable["code"]
+            ]
+            period_query["query"].append(
+                {
+                    "code": time_variable["code"],
+                    "selection": {"filter": "item", "values": fetch_codes},
+                }
+            )
+            update, response_metadata = self._fetch_all(
+                endpoint.url, period_query, metadata, refresh=True
+            )
+
+            df = df[~df[name].isin(update[name].unique())]
+            df = pd.concat(
+                self._align_categories([df, update]), ignore_index=True
+            )
+
+        updated = response_metadata[0]["updated"]
+        self.metadata_store.put(
+            endpoint.value, self.LANGUAGE, metadata, updated=updated
+        )
+        self.dataset_store.put(endpoint.url, query, df, response_metadata)
+        return df, response_metadata
+
+    def show_fields(self, endpoint: Endpoint):
+        metadata = self._get_metadata(endpoint)
+        for item in metadata["variables"]:
+            print(f"{item['code']}: {item['values']}")
+
+    def _get_metadata(self, endpoint: Endpoint, refresh=False) -> Dict:
+        metadata = None
+        if not refresh:
+            metadata = self.metadata_store.get(endpoint.value, self.LANGUAGE)
+
+        if metadata is None:
+            metadata_r = self.session.get(
+                endpoint.url, timeout=self.timeout, force_refresh=refresh
+            )
+            metadata_r.raise_for_status()
+            metadata = metadata_r.json()
+            self.metadata_store.put(endpoint.value, self.LANGUAGE, metadata)
+
+        return metadata
+
+    def _fetch_all(
+        self,
+        url: str,
+        query: dict,
+        metadata: dict,
+        stream: bool = False,
+        response_format: str = "json",
+        refresh: bool = False,
+    ) -> Tuple[pd.DataFrame, list]:
+        queries = self._split_query(query, metadata)
+
+        def fetch(chunk_query):
+            return self._fetch(
+                url, chunk_query, metadata, stream, response_format, refresh
+            )
+
+        if len(queries) == 1:
+            results = [fetch(queries[0])]
+        else:
+            workers = min(self.MAX_WORKERS, len(queries))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fetch, queries))
+
+        # Chunks share the metadata categories, so concat keeps categoricals
+        df = pd.concat([frame for frame, _ in results], ignore_index=True)
+
+        return df, self._merge_metadata([meta for _, meta in results])
+
+    def _fetch(
+        self,
+        url: str,
+        query: dict,
+        metadata: dict,
+        stream: bool,
+        response_format: str,
+        refresh: bool,
+    ) -> Tuple[pd.DataFrame, list]:
+        if response_format == "json-stat2":
+            try:
+                response = self._post(
+                    url,
+                    dict(query, response={"format": "json-stat2"}),
+                    refresh,
+                )
+                return self._transform_json_stat(response.json(), metadata)
+            except (requests.HTTPError, KeyError, ValueError) as e:
+                warnings.warn(
+                    f"json-stat2 request failed ({e}), falling back to json"
+                )
+
+        response = self._post(url, query, refresh)
+        if stream:
+            return self._stream_transform(
+                response.iter_content(chunk_size=1 << 16),
+                metadata,
+                self._estimate_rows(query, metadata),
+            )
+
+        response_data = response.json()
+        return (
+            self._transform_data(response_data, metadata),
+            response_data["metadata"],
+        )
+
+    def _post(
+        self, url: str, query: dict, refresh: bool = False
+    ) -> requests.Response:
+        sent = self._rate_limiter.acquire()
+        response = self.session.post(
+            url,
+            json=query,
+            timeout=self.timeout,
+            stream=True,
+            force_refresh=refresh,
+        )
+        if getattr(response, "from_cache", False):
+            self._rate_limiter.release(sent)
+
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _build_query(metadata: dict, selected_fields: dict = None) -> Dict:
         query = {"query": [], "response": {"format": "json"}}
-        metadata = self._get_metadata(endpoint.url)
 
         for item in metadata["variables"]:
             field_code = item["code"]
@@ -75,94 +354,532 @@ class StatisticsSweden:
                     }
                 )
 
-        response = requests.post(endpoint.url, json=query, timeout=None)
-        response.raise_for_status()
-        response_data = response.json()
+        return query
+
+    @staticmethod
+    def _push_down(
+        query: dict, metadata: dict, aggregate: List[str]
+    ) -> Tuple[Dict, List[str]]:
+        # Let the server total what it can: eliminate variables whose values
+        # are all selected, or select an existing summed code such as "1+2".
+        # Returns the rewritten query and the variables left to reduce.
+        variables = {item["code"]: item for item in metadata["variables"]}
+        query = copy.deepcopy(query)
+        reduce = []
+
+        for code in aggregate:
+            if code not in variables:
+                raise ValueError(f"Unknown variable to aggregate: {code}")
+
+            variable = variables[code]
+            field = next(
+                (f for f in query["query"] if f["code"] == code), None
+            )
+            selection = field["selection"] if field else None
+            all_values = field is None or (
+                selection["filter"] == "item"
+                and selection["values"] == variable["values"]
+            )
+
+            if all_values and variable.get("elimination", False):
+                if field is not None:
+                    query["query"].remove(field)
+                continue
+
+            reduce.append(code)
+            if selection is not None and selection["filter"] == "item":
+                total = "+".join(selection["values"])
+                if total in variable["values"]:
+                    selection["values"] = [total]
+
+        return query, reduce
+
+    @staticmethod
+    def _aggregate(
+        df: pd.DataFrame, metadata: dict, reduce: List[str]
+    ) -> pd.DataFrame:
+        names = {
+            item["code"]: item["text"].lower().replace(" ", "_")
+            for item in metadata["variables"]
+        }
+        dropped = [names[code] for code in reduce if names[code] in df.columns]
+        keys = [
+            names[code]
+            for code in names
+            if code != "ContentsCode"
+            and names[code] in df.columns
+            and names[code] not in dropped
+        ]
+        measures = [
+            col for col in df.columns if col not in keys and col not in dropped
+        ]
+
+        if not dropped:
+            return df
+        if not keys:
+            return df[measures].sum(min_count=1).to_frame().T
 
         return (
-            self._transform_data(response_data, metadata),
-            response_data["metadata"],
+            df.groupby(keys, observed=True, sort=False)[measures]
+            .sum(min_count=1)
+            .reset_index()
         )
 
-    def show_fields(self, endpoint: Endpoint):
-        metadata = self._get_metadata(endpoint.url)
+    @staticmethod
+    def _split_query(query: dict, metadata: dict) -> List[Dict]:
+        expanded = StatisticsSweden._expand_query(query, metadata)
+        sizes = StatisticsSweden._selection_sizes(expanded, metadata)
+        cells = math.prod(sizes)
+
+        splittable = [
+            i
+            for i, field in enumerate(expanded["query"])
+            if field["selection"]["filter"] == "item" and sizes[i] > 1
+        ]
+        if cells <= StatisticsSweden.MAX_CELLS or not splittable:
+            return [query]
+
+        largest = max(splittable, key=lambda i: sizes[i])
+        values = expanded["query"][largest]["selection"]["values"]
+        per_query = max(
+            1, StatisticsSweden.MAX_CELLS // (cells // sizes[largest])
+        )
+
+        queries = []
+        for start in range(0, len(values), per_query):
+            chunk = copy.deepcopy(expanded)
+            chunk["query"][largest]["selection"]["values"] = values[
+                start : start + per_query
+            ]
+            queries.extend(StatisticsSweden._split_query(chunk, metadata))
+
+        return queries
+
+    @staticmethod
+    def _expand_query(query: dict, metadata: dict) -> Dict:
+        # Mandatory variables left out of a query come back in full; list
+        # them explicitly so they can be counted and split like the rest
+        expanded = copy.deepcopy(query)
+        selected = {field["code"] for field in query["query"]}
         for item in metadata["variables"]:
-            print(f"{item['code']}: {item['values']}")
+            if item["code"] not in selected and not item.get("elimination"):
+                expanded["query"].append(
+                    {
+                        "code": item["code"],
+                        "selection": {
+                            "filter": "item",
+                            "values": item["values"],
+                        },
+                    }
+                )
+
+        return expanded
 
-    def _get_metadata(self, url: str) -> Dict:
-        metadata_r = requests.get(url, timeout=None)
-        metadata_r.raise_for_status()
-        return metadata_r.json()
+    @staticmethod
+    def _estimate_rows(query: dict, metadata: dict) -> int:
+        # Contents codes become value columns, everything else a row key
+        expanded = StatisticsSweden._expand_query(query, metadata)
+        sizes = StatisticsSweden._selection_sizes(expanded, metadata)
+        return math.prod(
+            size
+            for field, size in zip(expanded["query"], sizes)
+            if field["code"] != "ContentsCode"
+        )
+
+    @staticmethod
+    def _selection_sizes(query: dict, metadata: dict) -> List[int]:
+        variables = {item["code"]: item for item in metadata["variables"]}
+        return [
+            StatisticsSweden._selection_size(
+                field["selection"], variables.get(field["code"], {})
+            )
+            for field in query["query"]
+        ]
+
+    @staticmethod
+    def _selection_size(selection: dict, variable: dict) -> int:
+        values = selection["values"]
+        if selection["filter"] == "top":
+            return int(values[0])
+        if selection["filter"] == "all":
+            return sum(
+                any(fnmatch.fnmatch(code, pattern) for pattern in values)
+                for code in variable.get("values", [])
+            )
+        return len(values)
+
+    @staticmethod
+    def _align_categories(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        # Frames decoded against different metadata releases can have
+        # different categories; give them the union so concat keeps them
+        frames = [frame.copy() for frame in frames]
+        for name, dtype in frames[0].dtypes.items():
+            if not isinstance(dtype, pd.CategoricalDtype):
+                continue
+
+            categories = dtype.categories
+            for frame in frames[1:]:
+                categories = categories.union(
+                    frame[name].cat.categories, sort=False
+                )
+            for frame in frames:
+                frame[name] = frame[name].cat.set_categories(categories)
+
+        return frames
+
+    @staticmethod
+    def _merge_metadata(metadata_lists: List[list]) -> List[Dict]:
+        merged = []
+        for metadata in metadata_lists:
+            for item in metadata:
+                if item not in merged:
+                    merged.append(item)
+        return merged
 
     @staticmethod
     def _transform_data(response_data: dict, metadata: dict) -> pd.DataFrame:
         columns_info = response_data["columns"]
-        dimensions = [
-            col["text"].lower().replace(" ", "_")
-            for col in columns_info
-            if col["type"] == "d"
+        key_columns = [col for col in columns_info if col["type"] != "c"]
+        measure_columns = [col for col in columns_info if col["type"] == "c"]
+        variables = {var["code"]: var for var in metadata["variables"]}
+
+        # Split the rows straight into column arrays, no per-row records
+        data = response_data["data"]
+        keys = np.array([item["key"] for item in data], dtype=object)
+        keys = keys.reshape(len(data), len(key_columns))
+        values = np.array([item["values"] for item in data], dtype=object)
+        values = values.reshape(len(data), len(measure_columns))
+
+        columns = {}
+        for i, column in enumerate(key_columns):
+            name = StatisticsSweden._column_name(column)
+            variable = variables.get(column["code"], {})
+            codes = StatisticsSweden._value_positions(keys[:, i], variable)
+
+            if column["type"] == "t":
+                columns[name] = StatisticsSweden._to_time(
+                    name, keys[:, i], codes, variable
+                )
+            elif codes is not None and "valueTexts" in variable:
+                columns[name] = StatisticsSweden._to_categorical(
+                    codes, variable
+                )
+            else:
+                columns[name] = keys[:, i]
+
+        for i, column in enumerate(measure_columns):
+            columns[StatisticsSweden._column_name(column)] = pd.to_numeric(
+                values[:, i], errors="coerce"
+            )
+
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def _transform_json_stat(
+        dataset: dict, metadata: dict
+    ) -> Tuple[pd.DataFrame, list]:
+        # json-stat2 is dense: values are laid out row-major over the
+        # dimensions in `id`, so row keys follow from the shape alone
+        variables = {var["code"]: var for var in metadata["variables"]}
+        dimensions = dataset["id"]
+        sizes = dataset["size"]
+        metric = dataset.get("role", {}).get("metric", ["ContentsCode"])[0]
+        metric_axis = dimensions.index(metric)
+
+        values = np.array(dataset["value"], dtype=np.float64).reshape(sizes)
+        values = np.moveaxis(values, metric_axis, -1)
+        values = values.reshape(-1, sizes[metric_axis])
+
+        key_dimensions = [code for code in dimensions if code != metric]
+        key_sizes = [sizes[dimensions.index(code)] for code in key_dimensions]
+        time_dimensions = dataset.get("role", {}).get("time", [])
+
+        columns = {}
+        for i, code in enumerate(key_dimensions):
+            dimension = dataset["dimension"][code]
+            name = dimension["label"].lower().replace(" ", "_")
+            variable = variables.get(code, {})
+            category_codes = StatisticsSweden._category_codes(dimension)
+
+            # Positions cycle fastest along the last dimension
+            positions = np.tile(
+                np.repeat(
+                    np.arange(key_sizes[i]), math.prod(key_sizes[i + 1 :])
+                ),
+                math.prod(key_sizes[:i]),
+            )
+
+            if code in time_dimensions:
+                periods = StatisticsSweden._parse_periods(
+                    name, np.array(category_codes, dtype=object)
+                )
+                columns[name] = np.asarray(periods)[positions]
+            elif "values" in variable and "valueTexts" in variable:
+                codes = StatisticsSweden._value_positions(
+                    category_codes, variable
+                )
+                columns[name] = StatisticsSweden._to_categorical(
+                    codes[positions], variable
+                )
+            else:
+                columns[name] = np.array(category_codes, dtype=object)[
+                    positions
+                ]
+
+        metric_labels = dataset["dimension"][metric]["category"]["label"]
+        for i, code in enumerate(
+            StatisticsSweden._category_codes(dataset["dimension"][metric])
+        ):
+            name = metric_labels[code].lower().replace(" ", "_")
+            columns[name] = StatisticsSweden._as_numbers(values[:, i])
+
+        return pd.DataFrame(columns), [
+            {
+                "infofile": (
+                    dataset.get("extension", {}).get("px", {}).get("infofile")
+                ),
+                "updated": StatisticsSweden._local_time(dataset["updated"]),
+                "label": dataset.get("label"),
+                "source": dataset.get("source"),
+            }
         ]
-        time_dimension = next(
-            (
-                col["text"].lower().replace(" ", "_")
-                for col in columns_info
-                if col["type"] == "t"
-            ),
-            None,
+
+    @staticmethod
+    def _category_codes(dimension: dict) -> List[str]:
+        index = dimension["category"].get("index")
+        if index is None:
+            return list(dimension["category"]["label"])
+        if isinstance(index, list):
+            return index
+        return sorted(index, key=index.get)
+
+    @staticmethod
+    def _local_time(updated: str) -> str:
+        # json-stat2 reports UTC, the json format local Swedish time
+        timestamp = datetime.fromisoformat(updated.replace("Z", "+00:00"))
+        if timestamp.tzinfo is None:
+            return updated
+
+        return (
+            timestamp.astimezone(StatisticsSweden.TIME_ZONE)
+            .replace(tzinfo=None)
+            .isoformat()
         )
-        measures = [
-            col["text"].lower().replace(" ", "_")
-            for col in columns_info
-            if col["type"] == "c"
-        ]
 
-        # Generate mappings for dimensions from metadata
-        mappings = {
-            var["text"]
-            .lower()
-            .replace(" ", "_"): dict(zip(var["values"], var["valueTexts"]))
-            for var in metadata["variables"]
-            if "values" in var
-            and "valueTexts" in var
-            and var["text"].lower().replace(" ", "_") in dimensions
-        }
+    @staticmethod
+    def _as_numbers(measure: np.ndarray) -> np.ndarray:
+        # Match pd.to_numeric, which keeps whole numbers as integers
+        if not np.isnan(measure).any() and (measure % 1 == 0).all():
+            return measure.astype(np.int64)
+        return measure
 
-        # Generate records from response_data['data']
-        records = []
-        for item in response_data["data"]:
-            record = dict(
-                zip(
-                    dimensions + ([time_dimension] if time_dimension else []),
-                    item["key"],
-                )
+    @staticmethod
+    def _stream_transform(
+        chunks: Iterable[bytes], metadata: dict, rows: int
+    ) -> Tuple[pd.DataFrame, list]:
+        # Feed the body to an incremental parser and write each key and
+        # value straight into preallocated column buffers, so no JSON tree
+        # or per-row objects are ever built
+        variables = {var["code"]: var for var in metadata["variables"]}
+        events = ijson.sendable_list()
+        parser = ijson.parse_coro(events)
+        builders = {}
+        buffers = None
+
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                # SCB prefixes its JSON with a byte order mark
+                chunk = chunk.removeprefix(b"\xef\xbb\xbf")
+            parser.send(chunk)
+
+            for prefix, event, value in events:
+                if prefix == "data.item.key.item":
+                    buffers.add_key(value)
+                elif prefix == "data.item.values.item":
+                    buffers.add_value(value)
+                elif prefix == "data.item":
+                    if event == "start_map":
+                        buffers.next_row()
+                elif prefix == "data":
+                    if event == "start_array":
+                        buffers = _ColumnBuffers(
+                            builders["columns"].value, variables, rows
+                        )
+                elif prefix and not prefix.startswith("data."):
+                    section = prefix.split(".", 1)[0]
+                    builders.setdefault(section, ijson.ObjectBuilder())
+                    builders[section].event(event, value)
+            del events[:]
+        parser.close()
+
+        if buffers is None:
+            buffers = _ColumnBuffers(builders["columns"].value, variables, 0)
+
+        return buffers.to_dataframe(), builders["metadata"].value
+
+    @staticmethod
+    def _column_name(column: dict) -> str:
+        return column["text"].lower().replace(" ", "_")
+
+    @staticmethod
+    def _value_positions(keys: np.ndarray, variable: dict) -> np.ndarray:
+        # Position of each key in the metadata value list, -1 if unknown
+        if "values" not in variable:
+            return None
+
+        positions = {code: i for i, code in enumerate(variable["values"])}
+        return np.fromiter(
+            (positions.get(key, -1) for key in keys),
+            dtype=np.intp,
+            count=len(keys),
+        )
+
+    @staticmethod
+    def _to_time(name: str, keys: np.ndarray, codes, variable: dict):
+        # Parse each distinct period once, then broadcast by position
+        if codes is not None and (codes >= 0).all():
+            periods = StatisticsSweden._parse_periods(
+                name, np.array(variable["values"], dtype=object)
             )
+            return np.asarray(periods)[codes]
+
+        return StatisticsSweden._parse_periods(name, keys)
+
+    @staticmethod
+    def _parse_periods(name: str, periods: np.ndarray):
+        if name == "year":
+            return pd.to_numeric(periods)
+        if name == "month":
+            return pd.to_datetime(periods, format="%YM%m")
+        return periods
+
+    @staticmethod
+    def _to_categorical(codes: np.ndarray, variable: dict) -> pd.Categorical:
+        # Categories are the metadata texts, so frames decoded from the same
+        # table share one set of categories and concatenate cheaply
+        texts = pd.Index(variable["valueTexts"])
+        categories = texts.unique()
+        text_codes = np.append(categories.get_indexer(texts), -1)
+
+        return pd.Categorical.from_codes(
+            text_codes[codes], categories=categories
+        )
+
 
-            # Map measure values
-            for i, value in enumerate(item["values"]):
-                record[measures[i]] = value
+# Sliding window limit on the calls that actually reach the server, shared
+# by the sync client and AsyncStatisticsSweden, which waits with asyncio
+class _RateLimiter:
 
-            records.append(record)
+    def __init__(self, calls: int, period: float):
+        self._calls = calls
+        self._period = period
+        self._sent = deque()
+        self._lock = threading.Lock()
 
-        # Create DataFrame
-        df = pd.DataFrame(records)
+    def acquire(self) -> float:
+        while True:
+            sent, wait = self.reserve()
+            if sent is not None:
+                return sent
+            time.sleep(wait)
 
-        # Convert numeric columns (measures)
-        for measure in measures:
-            if measure in df.columns:
-                df[measure] = pd.to_numeric(df[measure], errors="coerce")
+    def reserve(self) -> Tuple[Optional[float], float]:
+        # The send time if a call may go now, or None and how long to wait
+        with self._lock:
+            now = time.monotonic()
+            while self._sent and self._sent[0] <= now - self._period:
+                self._sent.popleft()
 
-        # Convert time dimension if it exists
-        if time_dimension and time_dimension in df.columns:
-            if time_dimension == "year":
-                df[time_dimension] = pd.to_numeric(df[time_dimension])
-            if time_dimension == "month":
-                df[time_dimension] = pd.to_datetime(
-                    df[time_dimension], format="%YM%m"
+            if len(self._sent) < self._calls:
+                self._sent.append(now)
+                return now, 0.0
+
+            return None, self._sent[0] + self._period - now
+
+    def release(self, sent: float):
+        with self._lock:
+            try:
+                self._sent.remove(sent)
+            except ValueError:
+                pass
+
+
+# Column buffers filled one key or value at a time while streaming. Keys are
+# stored as positions in the metadata value lists, extended on the fly for
+# codes the metadata does not know about.
+class _ColumnBuffers:
+
+    def __init__(self, columns_info: list, variables: dict, rows: int):
+        self._key_columns = [col for col in columns_info if col["type"] != "c"]
+        self._measure_columns = [
+            col for col in columns_info if col["type"] == "c"
+        ]
+        self._variables = [
+            variables.get(col["code"], {}) for col in self._key_columns
+        ]
+        self._values = [list(var.get("values", [])) for var in self._variables]
+        self._positions = [
+            {code: i for i, code in enumerate(values)}
+            for values in self._values
+        ]
+
+        rows = max(rows, 1)
+        self._codes = np.empty((rows, len(self._key_columns)), dtype=np.intp)
+        self._measures = np.empty(
+            (rows, len(self._measure_columns)), dtype=np.float64
+        )
+        self._row = -1
+        self._key = 0
+        self._measure = 0
+
+    def next_row(self):
+        self._row += 1
+        self._key = 0
+        self._measure = 0
+        if self._row == len(self._codes):
+            self._codes = np.concatenate([self._codes, self._codes])
+            self._measures = np.concatenate([self._measures, self._measures])
+
+    def add_key(self, code: str):
+        positions = self._positions[self._key]
+        position = positions.get(code)
+        if position is None:
+            position = positions[code] = len(self._values[self._key])
+            self._values[self._key].append(code)
+
+        self._codes[self._row, self._key] = position
+        self._key += 1
+
+    def add_value(self, value):
+        try:
+            self._measures[self._row, self._measure] = float(value)
+        except (TypeError, ValueError):
+            self._measures[self._row, self._measure] = np.nan
+        self._measure += 1
+
+    def to_dataframe(self) -> pd.DataFrame:
+        rows = self._row + 1
+        columns = {}
+        for i, column in enumerate(self._key_columns):
+            name = StatisticsSweden._column_name(column)
+            variable = self._variables[i]
+            codes = self._codes[:rows, i]
+            values = np.array(self._values[i], dtype=object)
+
+            if column["type"] == "t":
+                periods = StatisticsSweden._parse_periods(name, values)
+                columns[name] = np.asarray(periods)[codes]
+            elif "valueTexts" in variable:
+                known = len(variable["values"])
+                columns[name] = StatisticsSweden._to_categorical(
+                    np.where(codes < known, codes, -1), variable
                 )
+            else:
+                columns[name] = values[codes]
 
-        # Apply mappings to dimension columns
-        for dimension in dimensions:
-            if dimension in df.columns and dimension in mappings:
-                df[dimension] = df[dimension].map(mappings[dimension])
+        for i, column in enumerate(self._measure_columns):
+            columns[StatisticsSweden._column_name(column)] = (
+                StatisticsSweden._as_numbers(self._measures[:rows, i].copy())
+            )
 
-        return df
+        return pd.DataFrame(columns)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import random
+from typing import Dict, Iterable, List, Tuple, Union
+
+import aiohttp
+import pandas as pd
+
+from dataset_store import DatasetStore
+from metadata_store import MetadataStore
+from statistics_sweden import StatisticsSweden, _RateLimiter
+
+
+# Fetches many tables concurrently over one connection pool and returns the
+# same (DataFrame, metadata) tuples as StatisticsSweden.get_dataframe. Each
+# request is an Endpoint or an (endpoint, selected_fields[, aggregate]) tuple.
+# Calls keep to the same rate limit as the sync client.
+class AsyncStatisticsSweden:
+    Endpoint = StatisticsSweden.Endpoint
+
+    MAX_CONCURRENCY = 8
+    MAX_RETRIES = 5
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._rate_limiter = _RateLimiter(
+            StatisticsSweden.MAX_CALLS, StatisticsSweden.CALL_PERIOD
+        )
+        self.metadata_store = MetadataStore()
+        self.dataset_store = DatasetStore()
+
+    async def gather_dataframes(
+        self,
+        requests: Iterable[Union[Endpoint, Tuple]],
+    ) -> List[Tuple[pd.DataFrame, dict]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=120)
+
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+            return await asyncio.gather(
+                *(
+                    self._get_dataframe(session, semaphore, *request)
+                    for request in map(self._unpack, requests)
+                )
+            )
+
+    async def _get_dataframe(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        endpoint: Endpoint,
+        selected_fields: dict = None,
+        aggregate: List[str] = None,
+        refresh: bool = False,
+    ) -> Tuple[pd.DataFrame, dict]:
+        metadata = await self._get_metadata(
+            session, semaphore, endpoint, refresh
+        )
+        query = StatisticsSweden._build_query(metadata, selected_fields)
+        reduce = []
+        if aggregate:
+            query, reduce = StatisticsSweden._push_down(
+                query, metadata, aggregate
+            )
+
+        cached = None
+        if not refresh:
+            cached = self.dataset_store.get(
+                endpoint.url,
+                query,
+                self.metadata_store.updated(
+                    endpoint.value, StatisticsSweden.LANGUAGE
+                ),
+            )
+        if cached is not None:
+            df, response_metadata = cached
+            return (
+                StatisticsSweden._aggregate(df, metadata, reduce),
+                response_metadata,
+            )
+
+        responses = await asyncio.gather(
+            *(
+                self._request(session, semaphore, "POST", endpoint.url, q)
+                for q in StatisticsSweden._split_query(query, metadata)
+            )
+        )
+
+        frames = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    StatisticsSweden._transform_data, data, metadata
+                )
+                for data in responses
+            )
+        )
+        df = pd.concat(frames, ignore_index=True)
+
+        response_metadata = StatisticsSweden._merge_metadata(
+            [data["metadata"] for data in responses]
+        )
+        if (
+            not self.metadata_store.validate(
+                endpoint.value,
+                StatisticsSweden.LANGUAGE,
+                response_metadata[0]["updated"],
+            )
+            and not refresh
+        ):
+            # Data and stored metadata from different releases; see
+            # StatisticsSweden.get_dataframe
+            return await self._get_dataframe(
+                session,
+                semaphore,
+                endpoint,
+                selected_fields,
+                aggregate,
+                refresh=True,
+            )
+
+        self.dataset_store.put(endpoint.url, query, df, response_metadata)
+        return (
+            StatisticsSweden._aggregate(df, metadata, reduce),
+            response_metadata,
+        )
+
+    async def _get_metadata(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        endpoint: Endpoint,
+        refresh=False,
+    ) -> Dict:
+        language = StatisticsSweden.LANGUAGE
+        metadata = None
+        if not refresh:
+            metadata = self.metadata_store.get(endpoint.value, language)
+
+        if metadata is None:
+            metadata = await self._request(
+                session, semaphore, "GET", endpoint.url
+            )
+            self.metadata_store.put(endpoint.value, language, metadata)
+
+        return metadata
+
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        method: str,
+        url: str,
+        query: dict = None,
+    ) -> Dict:
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self._acquire()
+            async with semaphore:
+                async with session.request(method, url, json=query) as r:
+                    if r.status != 429 or attempt == self.MAX_RETRIES:
+                        r.raise_for_status()
+                        # SCB prefixes its JSON with a byte order mark
+                        return json.loads((await r.read()).decode("utf-8-sig"))
+
+                    retry_after = r.headers.get("Retry-After", "")
+
+            # Back off outside the semaphore so other requests can proceed
+            delay = float(retry_after) if retry_after.isdigit() else 2**attempt
+            await asyncio.sleep(delay + random.uniform(0, 1))
+
+    async def _acquire(self):
+        while True:
+            sent, wait = self._rate_limiter.reserve()
+            if sent is not None:
+                return
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    def _unpack(request) -> Tuple:
+        if isinstance(request, tuple):
+            return request
+        return (request,)
@@ -0,0 +1,307 @@
+import argparse
+import os
+import re
+import timeit
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Set
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+NAMESPACES = {
+    "": SVG_NS,
+    "xlink": XLINK_NS,
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "cc": "http://creativecommons.org/ns#",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+}
+for prefix, uri in NAMESPACES.items():
+    ET.register_namespace(prefix, uri)
+
+G = f"{{{SVG_NS}}}g"
+PATH = f"{{{SVG_NS}}}path"
+DEFS = f"{{{SVG_NS}}}defs"
+STYLE = f"{{{SVG_NS}}}style"
+CLIP_PATH = f"{{{SVG_NS}}}clipPath"
+HREF = f"{{{XLINK_NS}}}href"
+
+# Not `transform`: a rounded scale() or matrix() distorts a whole subtree
+COORDINATE_ATTRIBUTES = ("d", "x", "y", "width", "height")
+NUMBER = re.compile(r"-?\d*\.\d+")
+PATH_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)")
+PATH_COMMAND = re.compile(r"[A-Za-z]")
+REFERENCE = re.compile(r"url\(#([^)]+)\)")
+
+
+@dataclass
+class Report:
+    path: str
+    size_before: int
+    size_after: int
+    elements_before: int
+    elements_after: int
+    parse_before: float
+    parse_after: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.path}: {self.size_before / 1024:.1f} -> "
+            f"{self.size_after / 1024:.1f} KiB "
+            f"({1 - self.size_after / self.size_before:.0%} smaller), "
+            f"{self.elements_before} -> {self.elements_after} elements, "
+            f"parse {self.parse_before * 1000:.2f} -> "
+            f"{self.parse_after * 1000:.2f} ms"
+        )
+
+
+# Post-processing for matplotlib SVGs: rounds coordinates, merges runs of
+# identically styled, non-overlapping filled paths (the bars of ax.bar) into
+# one path, drops duplicate and unused <defs>, ids and bare groups, and
+# moves repeated inline styles into CSS classes. Rendering is unchanged up
+# to `precision`.
+def optimize_svg(path: str, precision: int = 2) -> Report:
+    with open(path, "rb") as f:
+        before = f.read()
+
+    root = ET.fromstring(before)
+    elements_before = sum(1 for _ in root.iter())
+
+    _round_coordinates(root, precision)
+    _merge_paths(root)
+    _dedupe_clip_paths(root)
+    _drop_unreferenced(root)
+    _unwrap_groups(root)
+    _classify_styles(root)
+
+    ET.indent(root, space="")
+    after = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(after)
+    os.replace(temp_path, path)
+
+    return Report(
+        path=str(path),
+        size_before=len(before),
+        size_after=len(after),
+        elements_before=elements_before,
+        elements_after=sum(1 for _ in root.iter()),
+        parse_before=_parse_time(before),
+        parse_after=_parse_time(after),
+    )
+
+
+def _round_coordinates(root: ET.Element, precision: int):
+    def round_number(match: re.Match) -> str:
+        rounded = f"{float(match.group()):.{precision}f}".rstrip("0")
+        rounded = rounded.rstrip(".")
+        return "0" if rounded in ("-0", "") else rounded
+
+    # The root keeps its exact size and viewBox
+    for element in root.iter():
+        if element is root:
+            continue
+        for name in COORDINATE_ATTRIBUTES:
+            value = element.get(name)
+            if value is not None:
+                value = NUMBER.sub(round_number, value)
+                element.set(name, " ".join(value.split()))
+
+
+def _merge_paths(root: ET.Element):
+    # Only paths that don't overlap are merged: where they did, the
+    # subpaths of one path would cancel or, under evenodd, punch holes
+    for parent in root.iter():
+        run, bounds = [], []
+        for child in list(parent):
+            key = _bar_key(child)
+            box = _bounds(child[0].get("d")) if key is not None else None
+            if (
+                run
+                and key == _bar_key(run[0])
+                and box is not None
+                and not any(_overlap(box, other) for other in bounds)
+            ):
+                run.append(child)
+                bounds.append(box)
+                continue
+            _merge_run(parent, run)
+            run = [child] if box is not None else []
+            bounds = [box] if box is not None else []
+        _merge_run(parent, run)
+
+
+def _bar_key(element: ET.Element):
+    # A group holding nothing but one closed, opaque path: the way
+    # matplotlib writes each Rectangle. Painting such paths as one is
+    # indistinguishable from painting them one after another.
+    if element.tag != G or set(element.attrib) - {"id"} or len(element) != 1:
+        return None
+
+    path = element[0]
+    style = path.get("style", "")
+    if (
+        path.tag != PATH
+        or set(path.attrib) - {"d", "style", "clip-path"}
+        or not path.get("d", "").rstrip().endswith("z")
+        or "opacity" in style
+    ):
+        return None
+    return style, path.get("clip-path")
+
+
+# The bounding box of a path's points, curve control points included, so it
+# holds the whole shape. None for commands other than absolute M, L, C, Q
+# and Z, where the numbers are not all x, y pairs.
+def _bounds(d: str):
+    if set(PATH_COMMAND.findall(d)) - set("MLCQZz"):
+        return None
+
+    numbers = [float(number) for number in PATH_NUMBER.findall(d)]
+    if not numbers or len(numbers) % 2:
+        return None
+    xs, ys = numbers[0::2], numbers[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+# Boxes that only touch, like stacked bars, don't overlap
+def _overlap(a, b) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _merge_run(parent: ET.Element, run: List[ET.Element]):
+    if len(run) < 2:
+        return
+
+    first = run[0][0]
+    first.set("d", " ".join(group[0].get("d") for group in run))
+    for group in run[1:]:
+        parent.remove(group)
+
+
+def _dedupe_clip_paths(root: ET.Element):
+    canonical = {}
+    replacements = {}
+    for defs in root.iter(DEFS):
+        for clip_path in list(defs.iter(CLIP_PATH)):
+            key = b"".join(ET.tostring(child) for child in clip_path)
+            clip_id = clip_path.get("id")
+            if key in canonical:
+                replacements[clip_id] = canonical[key]
+            else:
+                canonical[key] = clip_id
+
+    if not replacements:
+        return
+
+    for element in root.iter():
+        value = element.get("clip-path")
+        if value is not None:
+            element.set(
+                "clip-path",
+                REFERENCE.sub(
+                    lambda m: f"url(#{replacements.get(m[1], m[1])})", value
+                ),
+            )
+
+
+def _drop_unreferenced(root: ET.Element):
+    referenced = _references(root)
+
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if child.tag == DEFS:
+                for definition in list(child):
+                    if definition.tag != STYLE and (
+                        definition.get("id") not in referenced
+                    ):
+                        child.remove(definition)
+                if len(child) == 0:
+                    parent.remove(child)
+
+    for element in root.iter():
+        if element.get("id") not in referenced:
+            element.attrib.pop("id", None)
+
+
+def _references(root: ET.Element) -> Set[str]:
+    referenced = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if name == HREF and value.startswith("#"):
+                referenced.add(value[1:])
+            else:
+                referenced.update(REFERENCE.findall(value))
+    return referenced
+
+
+def _unwrap_groups(root: ET.Element):
+    for parent in list(root.iter()):
+        index = 0
+        while index < len(parent):
+            child = parent[index]
+            if child.tag == G and not child.attrib:
+                parent[index : index + 1] = list(child)
+            else:
+                index += 1
+
+
+def _classify_styles(root: ET.Element):
+    counts = Counter(
+        element.get("style")
+        for element in root.iter()
+        if element.get("style") and element.tag != STYLE
+    )
+    classes: Dict[str, str] = {
+        style: f"s{i}"
+        for i, (style, count) in enumerate(counts.most_common())
+        if count > 1
+    }
+    if not classes:
+        return
+
+    for element in root.iter():
+        name = classes.get(element.get("style"))
+        if name is not None:
+            del element.attrib["style"]
+            element.set("class", name)
+
+    stylesheet = root.find(f"{DEFS}/{STYLE}")
+    if stylesheet is None:
+        defs = root.find(DEFS)
+        if defs is None:
+            defs = ET.Element(DEFS)
+            root.insert(0, defs)
+        stylesheet = ET.SubElement(defs, STYLE, {"type": "text/css"})
+
+    stylesheet.text = (stylesheet.text or "") + "".join(
+        f".{name}{{{style}}}" for style, name in classes.items()
+    )
+
+
+def _parse_time(data: bytes) -> float:
+    return min(timeit.repeat(lambda: ET.fromstring(data), number=1, repeat=5))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Shrink matplotlib SVGs in place"
+    )
+    parser.add_argument(
+        "files", nargs="*", help="SVG files (default: *.svg here)"
+    )
+    parser.add_argument(
+        "--precision", type=int, default=2, help="decimals kept"
+    )
+    args = parser.parse_args(argv)
+
+    for path in args.files or sorted(map(str, Path(".").glob("*.svg"))):
+        print(optimize_svg(path, args.precision))
+
+
+if __name__ == "__main__":
+    main()
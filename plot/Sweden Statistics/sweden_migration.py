@@ -1,21 +1,14 @@
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 
+from bars import bar_series
+from charts import Chart, Dataset
 from colours import BangWongColors
+from plot_style import apply_style
 from statistics_sweden import StatisticsSweden
 
 
-def generate_plot(df, metadata):
-
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Regular.ttf"
-    )
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Bold.ttf"
-    )
-    plt.rcParams["font.sans-serif"] = ["Liberation Sans"]
-
-    plt.rcParams.update(
+def configure_plots():
+    apply_style(
         {
             "font.size": 14,
             "axes.labelsize": 16,
@@ -24,22 +17,25 @@ def generate_plot(df, metadata):
             "ytick.labelsize": 14,
             "legend.fontsize": 14,
             "figure.titlesize": 20,
-            "svg.fonttype": "none",
         }
     )
 
-    plt.figure(figsize=(12, 6))
+
+def generate_plot(df, metadata):
+    fig = plt.figure(figsize=(12, 6))
     ax = plt.gca()
 
-    plt.bar(
+    bar_series(
+        ax,
         df["year"],
-        yearly_totals["immigrations"],
+        df["immigrations"],
         color=BangWongColors.BLUE,
         label="immigration",
     )
-    plt.bar(
+    bar_series(
+        ax,
         df["year"],
-        -yearly_totals["emigrations"],
+        -df["emigrations"],
         color=BangWongColors.RED_ORANGE,
         label="emigration",
     )
@@ -84,33 +80,30 @@ def generate_plot(df, metadata):
 
     plt.subplots_adjust(bottom=0.1)
 
-    plt.savefig(
-        (
+    return fig
+
+
+CHARTS = [
+    Chart(
+        output=(
             "Statistics Sweden (SCB) "
             "annual Immigration and Emigration 2000-2023"
             ".svg"
         ),
-        dpi=150,
-        bbox_inches="tight",
+        datasets=(
+            Dataset(
+                StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY,
+                {"Fodelseland": ["TOT"]},
+                ("Kon", "Fodelseland"),
+            ),
+        ),
+        render=generate_plot,
+        configure=configure_plots,
     )
-    plt.close()
-
-
-api_client = StatisticsSweden()
-
-fields = {
-    "Kon": ["1", "2"],
-    "Fodelseland": ["TOT"],
-}
+]
 
-df, metadata = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY, fields
-)
 
-yearly_totals = (
-    df.groupby("year")
-    .agg({"immigrations": "sum", "emigrations": "sum"})
-    .reset_index()
-)
+if __name__ == "__main__":
+    from build_charts import build
 
-generate_plot(yearly_totals, metadata)
+    build(CHARTS)
@@ -1,205 +1,36 @@
-import math
+from functools import partial
 
-import matplotlib.font_manager as fm
 import matplotlib.pyplot as plt
-from dateutil import parser
-from matplotlib.patches import Patch
 
+from bars import bar_series
+from chart_spec import ChartSpec, ColourGroup, compile_specs
+from charts import Chart, Dataset
 from colours import BangWongColors
+from footer import format_footer
+from plot_style import apply_style
 from statistics_sweden import StatisticsSweden
 
 
 def configure_plots():
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Regular.ttf"
-    )
-
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Bold.ttf"
-    )
-
-    plt.rcParams.update(
+    apply_style(
         {
             "font.size": 14,
-            "font.sans-serif": "Liberation Sans",
             "axes.labelsize": 16,
             "axes.titlesize": 20,
             "xtick.labelsize": 14,
             "ytick.labelsize": 14,
             "legend.fontsize": 14,
             "figure.titlesize": 20,
-            "svg.fonttype": "none",
         }
     )
 
 
-def plot_total_immgigration_bar_chart(data, footer_text):
-    fig, ax = plt.subplots(figsize=(12, 8))
-
-    # Define color mapping using Bang Wong's palette
-    color_map = {
-        "Sweden": BangWongColors.BLUE,
-        "Norway": BangWongColors.LIGHT_BLUE,
-        "Denmark": BangWongColors.LIGHT_BLUE,
-        "Finland": BangWongColors.LIGHT_BLUE,
-        "Germany": BangWongColors.GREEN,
-        "Poland": BangWongColors.GREEN,
-        "Somalia": BangWongColors.ORANGE,
-        "China": BangWongColors.PINK,
-        "India": BangWongColors.PINK,
-        "Iran": BangWongColors.RED_ORANGE,
-        "Afghanistan": BangWongColors.RED_ORANGE,
-        "Iraq": BangWongColors.RED_ORANGE,
-        "Syria": BangWongColors.RED_ORANGE,
-    }
-
-    ax.barh(
-        data.index,
-        data.values,
-        color=[color_map[country] for country in data.index],
-    )
-    ax.set_axisbelow(True)
-    ax.grid(axis="x", alpha=0.3)
-
-    ax.set_title(
-        "Share of Total Immigration to Sweden by Country of Birth (2000-2023)",
-        pad=24,
-        fontweight="bold",
-    )
-    fig.text(
-        0.5,
-        1,
-        "Countries contributing ≥2% of total",
-        ha="center",
-        transform=ax.transAxes,
-        va="bottom",
-        fontsize=14,
-    )
-
-    ax.set_xlabel("Percentage of Total Immigration")
-
-    # Add percentage labels
-    for i, v in enumerate(data):
-        ax.text(
-            v - 0.1, i, f"{v:.1f}%", va="center", ha="right", color="white"
-        )
-
-    ax.set_xlim(right=math.ceil(data.max()))
-
-    legend_elements = [
-        Patch(facecolor=BangWongColors.BLUE, label="Sweden"),
-        Patch(facecolor=BangWongColors.LIGHT_BLUE, label="Nordic Countries"),
-        Patch(
-            facecolor=BangWongColors.GREEN, label="Other European Countries"
-        ),
-        Patch(facecolor=BangWongColors.ORANGE, label="Africa"),
-        Patch(
-            facecolor=BangWongColors.RED_ORANGE,
-            label="Middle East and Central Asia",
-        ),
-        Patch(facecolor=BangWongColors.PINK, label="East and South Asia"),
-    ]
-    ax.legend(handles=legend_elements, loc="lower right")
-
-    fig.text(0, 0, footer_text, wrap=True, ha="left", va="bottom", fontsize=10)
-    fig.tight_layout(rect=[0, 0.02, 1, 1])
-    # fig.savefig(
-    #     (
-    #         "Share of Total Immigration "
-    #         "to Sweden by Country of Birth (2000-2023)"
-    #         ".svg"
-    #     ),
-    #     dpi=150,
-    #     bbox_inches="tight",
-    # )
-
-
-def plot_total_emigration_bar_chart(data, footer_text):
-    fig, ax = plt.subplots(figsize=(12, 8))
-
-    color_map = {
-        "Sweden": BangWongColors.BLUE,  # Domestic (highlight)
-        "Finland": BangWongColors.LIGHT_BLUE,  # Nordic countries
-        "Denmark": BangWongColors.LIGHT_BLUE,
-        "Norway": BangWongColors.LIGHT_BLUE,
-        "Iraq": BangWongColors.ORANGE,  # Middle East
-        "Germany": BangWongColors.GREEN,  # Rest of Europe
-        "Poland": BangWongColors.GREEN,
-        "India": BangWongColors.PINK,  # Asia
-        "China": BangWongColors.PINK,
-        "USA": BangWongColors.RED_ORANGE,  # Americas
-    }
-
-    ax.barh(
-        data.index,
-        data.values,
-        color=[color_map[country] for country in data.index],
-    )
-    ax.set_axisbelow(True)
-    ax.grid(axis="x", alpha=0.3)
-
-    ax.set_title(
-        (
-            "Share of Total Emigration "
-            "from Sweden by Country of Birth (2000-2023)"
-        ),
-        pad=24,
-        fontweight="bold",
-    )
-    fig.text(
-        0.5,
-        1,
-        "Countries contributing ≥2% of total",
-        ha="center",
-        transform=ax.transAxes,
-        va="bottom",
-        fontsize=14,
-    )
-
-    ax.set_xlabel("Percentage of Total Emigration")
-
-    for i, v in enumerate(data):
-        if data.index[i] == "Sweden":
-            ax.text(
-                v - 0.1, i, f"{v:.1f}%", va="center", ha="right", color="white"
-            )
-        else:
-            ax.text(
-                v + 0.1, i, f"{v:.1f}%", va="center", ha="left", color="black"
-            )
-
-    ax.set_xlim(right=math.ceil(data.max()))
-
-    legend_elements = [
-        Patch(facecolor=BangWongColors.BLUE, label="Sweden"),
-        Patch(facecolor=BangWongColors.LIGHT_BLUE, label="Nordic Countries"),
-        Patch(
-            facecolor=BangWongColors.GREEN, label="Other European Countries"
-        ),
-        Patch(facecolor=BangWongColors.ORANGE, label="Middle East"),
-        Patch(facecolor=BangWongColors.PINK, label="Asia"),
-        Patch(facecolor=BangWongColors.RED_ORANGE, label="Americas"),
-    ]
-    ax.legend(handles=legend_elements, loc="lower right")
-
-    fig.text(0, 0, footer_text, wrap=True, ha="left", va="bottom", fontsize=10)
-    fig.tight_layout(rect=[0, 0.02, 1, 1])
-    fig.savefig(
-        (
-            "Share of Total Emigration "
-            "from Sweden by Country of Birth (2000-2023)"
-            ".svg"
-        ),
-        dpi=150,
-        bbox_inches="tight",
-    )
-
-
 def plot_swedish_born_migration_flows(data, footer_text):
     fig, ax = plt.subplots(figsize=(15, 8))
 
     # Plot immigrations as positive bars
-    ax.bar(
+    bar_series(
+        ax,
         data["year"],
         data["immigrations"],
         color=BangWongColors.BLUE,
@@ -207,7 +38,8 @@ def plot_swedish_born_migration_flows(data, footer_text):
     )
 
     # Plot emigrations as negative bars
-    ax.bar(
+    bar_series(
+        ax,
         data["year"],
         -data["emigrations"],  # Negative values for downward bars
         color=BangWongColors.RED_ORANGE,
@@ -235,16 +67,7 @@ def plot_swedish_born_migration_flows(data, footer_text):
 
     fig.text(0, 0, footer_text, wrap=True, ha="left", va="bottom", fontsize=10)
     fig.tight_layout(rect=[0, 0.02, 1, 1])
-
-    fig.savefig(
-        (
-            "Migration Flows "
-            "of Swedish-Born Individuals (2000-2023)"
-            ".svg"
-        ),
-        dpi=150,
-        bbox_inches="tight",
-    )
+    return fig
 
 
 def plot_asylum_seekers_migration(df_summed, footer_text):
@@ -339,24 +162,10 @@ def plot_asylum_seekers_migration(df_summed, footer_text):
 
     fig.text(0, 0, footer_text, wrap=True, ha="left", va="bottom", fontsize=10)
     fig.tight_layout(rect=[0, 0.02, 1, 1])
+    return fig
 
-    fig.savefig(
-        (
-            "Immigration to Sweden from Countries "
-            "with Significant Asylum Applications (2000-2023)"
-            ".svg"
-        ),
-        dpi=150,
-        bbox_inches="tight",
-    )
-
-
-# MARK: Main
-
-(df, metadata) = api_client.get_dataframe(StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY)
-df = df[df["country_of_birth"] != "total"].copy()
 
-country_name_fixes = {
+COUNTRY_NAME_FIXES = {
     "Syrian Arab Republic": "Syria",
     "Iran (Islamic Republic of)": "Iran",
     "Russian Federation": "Russia",
@@ -365,88 +174,186 @@ country_name_fixes = {
     "United States of America": "USA",
 }
 
-df["country_of_birth"] = df["country_of_birth"].map(
-    lambda x: country_name_fixes.get(x, x)
-)
 
-df_summed = df.groupby(["year", "country_of_birth"], as_index=False).agg(
-    {"immigrations": "sum", "emigrations": "sum"}
-)
+def summarise_by_country(df):
+    df = df[df["country_of_birth"] != "total"].copy()
+    df["country_of_birth"] = df["country_of_birth"].map(
+        lambda x: COUNTRY_NAME_FIXES.get(x, x)
+    )
+    # A fixed name can meet the same country's other spelling, e.g. both
+    # "Russian Federation" and "Russia"; count them as one
+    return df.groupby(
+        ["year", "country_of_birth"], as_index=False, observed=True
+    ).agg({"immigrations": "sum", "emigrations": "sum"})
+
+
+def significant_shares(df_summed, column):
+    country_totals = df_summed.groupby("country_of_birth", observed=True)[
+        column
+    ].sum()
+
+    # Countries contributing >= 2% of the total
+    country_percentages = (country_totals / country_totals.sum()) * 100
+    return country_percentages[country_percentages >= 2].sort_values(
+        ascending=True
+    )
 
-country_totals_in = (
-    df_summed.groupby("country_of_birth")["immigrations"]
-    .sum()
-    .sort_values(ascending=False)
-)
 
-country_totals_out = (
-    df_summed.groupby("country_of_birth")["emigrations"]
-    .sum()
-    .sort_values(ascending=False)
-)
+def plot_immigration_by_country_over_time(df_summed):
+    top_countries = (
+        df_summed.groupby("country_of_birth", observed=True)["immigrations"]
+        .sum()
+        .nlargest(10)
+        .index
+    )
+    df_top = df_summed[df_summed["country_of_birth"].isin(top_countries)]
 
-# Calculate percentage of total immigration for each country
-total_immigration = country_totals_in.sum()
-total_emmigration = country_totals_out.sum()
-# Calculate percentage shares
-country_percentages_in = (country_totals_in / total_immigration) * 100
-country_percentages_out = (country_totals_out / total_emmigration) * 100
+    pivot_df = df_top.pivot(
+        index="year", columns="country_of_birth", values="immigrations"
+    )
 
-# Filter for countries with >= 2%
-significant_countries_in = country_percentages_in[country_percentages_in >= 2]
-significant_countries_in = significant_countries_in.sort_values(ascending=True)
+    ax = pivot_df.plot(kind="bar", stacked=True, figsize=(15, 8))
 
-significant_countries_out = country_percentages_out[
-    country_percentages_out >= 2
-]
-significant_countries_out = significant_countries_out.sort_values(
-    ascending=True
-)
+    ax.set_title("Immigration by Country Over Time")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Number of Immigrants")
+    ax.legend(
+        title="Country of Birth", bbox_to_anchor=(1.05, 1), loc="upper left"
+    )
+    ax.figure.tight_layout()
 
-configure_plots()
+    return ax.figure
 
-footer_text = (
-    f"Source: {metadata[0]['source']}"
-    f" - {metadata[0]['label']}"
-    f" ({metadata[0]['infofile']}) - "
-    f"Updated: {parser.isoparse(metadata[0]['updated'])
-                .strftime('%-d %b %Y')}"
-)
 
-plot_total_immgigration_bar_chart(significant_countries_in, footer_text)
-plot_total_emigration_bar_chart(significant_countries_out, footer_text)
+def render_asylum_seekers_migration(df, metadata):
+    return plot_asylum_seekers_migration(
+        summarise_by_country(df), format_footer(metadata)
+    )
 
-top_countries = country_totals_in.head(10).index
-df_top = df_summed[df_summed["country_of_birth"].isin(top_countries)]
 
-# MARK: Significant
+def render_swedish_born_migration_flows(df, metadata):
+    df_summed = summarise_by_country(df)
+    return plot_swedish_born_migration_flows(
+        df_summed[df_summed["country_of_birth"] == "Sweden"],
+        format_footer(metadata),
+    )
+
 
-pivot_df = df_top.pivot(
-    index="year", columns="country_of_birth", values="immigrations"
+MIGRATION_BY_COUNTRY = Dataset(
+    StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY, aggregate=("Kon",)
 )
-chart_data = pivot_df.reset_index()
 
-pivot_df.plot(kind="bar", stacked=True, figsize=(15, 8))
+SWEDEN = ColourGroup("Sweden", BangWongColors.BLUE, ("Sweden",))
+NORDIC = ColourGroup(
+    "Nordic Countries",
+    BangWongColors.LIGHT_BLUE,
+    ("Norway", "Denmark", "Finland"),
+)
+EUROPE = ColourGroup(
+    "Other European Countries", BangWongColors.GREEN, ("Germany", "Poland")
+)
 
-# Customize the plot
-plt.title("Immigration by Country Over Time")
-plt.xlabel("Year")
-plt.ylabel("Number of Immigrants")
-plt.legend(
-    title="Country of Birth", bbox_to_anchor=(1.05, 1), loc="upper left"
+# Its SVG is maintained by hand, so it is left out of the build
+IMMIGRATION_SHARES = ChartSpec(
+    output=(
+        "Share of Total Immigration to Sweden by Country of Birth (2000-2023)"
+        ".svg"
+    ),
+    dataset=MIGRATION_BY_COUNTRY,
+    kind="share_bars",
+    transforms=(
+        summarise_by_country,
+        partial(significant_shares, column="immigrations"),
+    ),
+    groups=(
+        SWEDEN,
+        NORDIC,
+        EUROPE,
+        ColourGroup("Africa", BangWongColors.ORANGE, ("Somalia",)),
+        ColourGroup(
+            "Middle East and Central Asia",
+            BangWongColors.RED_ORANGE,
+            ("Iran", "Afghanistan", "Iraq", "Syria"),
+        ),
+        ColourGroup(
+            "East and South Asia", BangWongColors.PINK, ("China", "India")
+        ),
+    ),
+    text={
+        "en": {
+            "title": (
+                "Share of Total Immigration "
+                "to Sweden by Country of Birth (2000-2023)"
+            ),
+            "subtitle": "Countries contributing ≥2% of total",
+            "x_label": "Percentage of Total Immigration",
+        }
+    },
+    configure=configure_plots,
 )
-plt.tight_layout()
 
-# MARK: Asylum
+EMIGRATION_SHARES = ChartSpec(
+    output=(
+        "Share of Total Emigration "
+        "from Sweden by Country of Birth (2000-2023)"
+        ".svg"
+    ),
+    dataset=MIGRATION_BY_COUNTRY,
+    kind="share_bars",
+    transforms=(
+        summarise_by_country,
+        partial(significant_shares, column="emigrations"),
+    ),
+    groups=(
+        SWEDEN,
+        NORDIC,
+        EUROPE,
+        ColourGroup("Middle East", BangWongColors.ORANGE, ("Iraq",)),
+        ColourGroup("Asia", BangWongColors.PINK, ("India", "China")),
+        ColourGroup("Americas", BangWongColors.RED_ORANGE, ("USA",)),
+    ),
+    options={"labels_inside": ("Sweden",)},
+    text={
+        "en": {
+            "title": (
+                "Share of Total Emigration "
+                "from Sweden by Country of Birth (2000-2023)"
+            ),
+            "subtitle": "Countries contributing ≥2% of total",
+            "x_label": "Percentage of Total Emigration",
+        }
+    },
+    configure=configure_plots,
+)
 
-plot_asylum_seekers_migration(df_summed, footer_text)
+# The stacked per-country chart is exploratory and left out of the build
+CHARTS = [
+    *compile_specs([EMIGRATION_SHARES]),
+    Chart(
+        output=(
+            "Immigration to Sweden from Countries "
+            "with Significant Asylum Applications (2000-2023)"
+            ".svg"
+        ),
+        datasets=(MIGRATION_BY_COUNTRY,),
+        render=render_asylum_seekers_migration,
+        configure=configure_plots,
+    ),
+    Chart(
+        output=(
+            "Migration Flows " "of Swedish-Born Individuals (2000-2023)" ".svg"
+        ),
+        datasets=(MIGRATION_BY_COUNTRY,),
+        render=render_swedish_born_migration_flows,
+        configure=configure_plots,
+    ),
+]
 
-# MARK: Swedish
 
-# Filter for Swedish-born people
-sweden_data = df_summed[df_summed["country_of_birth"] == "Sweden"]
+if __name__ == "__main__":
+    from build_charts import build
 
-plot_swedish_born_migration_flows(sweden_data, footer_text)
+    build(CHARTS)
 
 # MARK: labour
 # labor_countries = ["Poland", "India", "China", "Germany"]
@@ -467,5 +374,3 @@ plot_swedish_born_migration_flows(sweden_data, footer_text)
 # plt.ylabel("Number of Immigrants")
 # plt.legend()
 # plt.grid(True)
-
-plt.show()
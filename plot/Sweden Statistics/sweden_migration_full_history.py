@@ -1,28 +1,25 @@
-import locale
-from dateutil import parser
-from matplotlib import font_manager as fm
 from matplotlib import pyplot as plt
 from matplotlib.ticker import MultipleLocator
 
+from bars import bar_series
+from charts import Dataset, LocalizedChart
 from colours import BangWongColors
+from footer import format_footer
+from plot_style import apply_style
 from statistics_sweden import StatisticsSweden
 
 
 def configure_plots():
-    _configure_fonts()
-
-    plt.rcParams.update(
+    apply_style(
         {
             # Text and font settings
             "font.size": 14,
-            "font.sans-serif": "Liberation Sans",
             "axes.labelsize": 12,
             "axes.titlesize": 22,
             "axes.titleweight": "bold",
             "xtick.labelsize": 14,
             "ytick.labelsize": 14,
             "legend.fontsize": 14,
-            "svg.fonttype": "none",
             # Grid settings
             "grid.alpha": 0.5,
             "grid.linestyle": "--",
@@ -35,106 +32,94 @@ def configure_plots():
     )
 
 
-def _configure_fonts():
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Regular.ttf"
-    )
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Bold.ttf"
-    )
-
-
 def create_figure():
     fig, ax = plt.subplots()
     ax.grid(True)
     return fig, ax
 
 
-def add_footer(fig, text):
-    fig.text(0, 0, text, wrap=True, ha="left", va="bottom", fontsize=10)
-    fig.tight_layout(rect=[0, 0.02, 1, 1])
-
-
-def plot_sweden_migration(df, footer_text, lang="en"):
+def plot_sweden_migration(df, metadata):
     migration_data = df[["year", "immigrations", "emigrations"]].dropna()
+    first_year = migration_data["year"].min()
+    last_year = migration_data["year"].max()
 
     # Create figure and axis
     fig, ax = create_figure()
 
     # Plot lines using the specified color palette
-    ax.bar(
+    emigration = bar_series(
+        ax,
         migration_data["year"],
         -migration_data["emigrations"],
         color=BangWongColors.ORANGE,
         width=1,
-        label=TRANSLATIONS[lang]["emigration"],
     )
-    ax.bar(
+    immigration = bar_series(
+        ax,
         migration_data["year"],
         migration_data["immigrations"],
         color=BangWongColors.LIGHT_BLUE,
         width=1,
-        label=TRANSLATIONS[lang]["immigration"],
     )
 
-    ax.plot(
+    (net_migration,) = ax.plot(
         migration_data["year"],
         migration_data["immigrations"] - migration_data["emigrations"],
         color=BangWongColors.BLACK,
         alpha=0.8,
         linewidth=1,
-        label=TRANSLATIONS[lang]["net_migration"],
     )
 
     ax.axhline(y=0, color="black", linewidth=1, alpha=0.6)
 
-    ax.set_ylabel(TRANSLATIONS[lang]["y_label"], ha="left", y=0)
-    ax.set_title(
-        (
-            TRANSLATIONS[lang]["title"] + " "
-            f"({migration_data["year"].min()} - "
-            f"{migration_data["year"].max()})"
-        ),
-        pad=15,
-    )
+    ax.set_ylabel("", ha="left", y=0)
+    ax.set_title("", pad=15)
 
     # Add grid for better readability
     ax.yaxis.set_major_formatter(lambda x, p: f"{abs(int(x)):,}")
     ax.xaxis.set_major_locator(MultipleLocator(10))
     ax.yaxis.set_major_locator(MultipleLocator(20_000))
-    ax.set_xlim(
-        migration_data["year"].min() - 0.5, migration_data["year"].max() + 0.5
-    )
-
-    ax.legend(reverse=True)
-    add_footer(fig, footer_text)
-
-    return fig
-
-
-def format_date(date_str, lang="en"):
-    try:
-        current_locale = locale.getlocale()
-        locale.setlocale(locale.LC_TIME, LOCALE_MAPPING[lang])
-
-        date = parser.isoparse(date_str)
-        formatted_date = date.strftime("%-d %b %Y")
-
-        locale.setlocale(locale.LC_TIME, current_locale)
-
-        return formatted_date
-    except locale.Error:
-        return parser.isoparse(date_str).strftime("%-d %b %Y")
-
-
-def format_footer(metadata, lang="en"):
-    return (
-        f"{TRANSLATIONS[lang]['source']}: {metadata[0]['source']}"
-        f" - {metadata[0]['label']}"
-        f" ({metadata[0]['infofile']}) - "
-        f"{TRANSLATIONS[lang]['updated']}: "
-        f"{format_date(metadata[0]['updated'], lang)}"
-    )
+    ax.set_xlim(first_year - 0.5, last_year + 0.5)
+
+    footer = fig.text(0, 0, "", wrap=True, ha="left", va="bottom", fontsize=10)
+
+    # The geometry above is shared by every language; only the text changes
+    def localize(lang):
+        translations = TRANSLATIONS[lang]
+
+        ax.yaxis.label.set_text(translations["y_label"])
+        ax.title.set_text(
+            f"{translations['title']} ({first_year} - {last_year})"
+        )
+        ax.legend(
+            [net_migration, emigration, immigration],
+            [
+                translations["net_migration"],
+                translations["emigration"],
+                translations["immigration"],
+            ],
+            reverse=True,
+        )
+        footer.set_text(
+            format_footer(
+                metadata,
+                lang,
+                translations["source"],
+                translations["updated"],
+            )
+        )
+
+        # tight_layout starts from the current layout; reset it so every
+        # language is laid out as if drawn on a fresh figure
+        fig.subplots_adjust(
+            **{
+                side: plt.rcParams[f"figure.subplot.{side}"]
+                for side in ("left", "right", "bottom", "top")
+            }
+        )
+        fig.tight_layout(rect=[0, 0.02, 1, 1])
+
+    return fig, localize
 
 
 TRANSLATIONS = {
@@ -167,37 +152,35 @@ TRANSLATIONS = {
     },
 }
 
-LOCALE_MAPPING = {
-    "en": "en_GB.UTF-8",
-    "pl": "pl_PL.UTF-8",
-    "sv": "sv_SE.UTF-8",
-}
+POPULATION_CHANGES = Dataset(
+    StatisticsSweden.Endpoint.POPULATION_CHANGES,
+    {
+        "Kon": ["1+2"],
+        "ContentsCode": [
+            "000000LV",
+            "0000001H",
+            "0000001F",
+            "000000LX",
+            "0000001G",
+        ],
+    },
+)
 
-api_client = StatisticsSweden()
-
-fields = {
-    "Kon": ["1+2"],
-    "ContentsCode": [
-        "000000LV",
-        "0000001H",
-        "0000001F",
-        "000000LX",
-        "0000001G",
-    ],
-}
+CHARTS = [
+    LocalizedChart(
+        output=(
+            "Annual Immigration and Emigration in Sweden (1875-2023)"
+            "-{lang}.svg"
+        ),
+        datasets=(POPULATION_CHANGES,),
+        render=plot_sweden_migration,
+        configure=configure_plots,
+        languages=tuple(TRANSLATIONS),
+    )
+]
 
-pd, metadata = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.POPULATION_CHANGES, fields
-)
 
-configure_plots()
+if __name__ == "__main__":
+    from build_charts import build
 
-for lang in ["en", "pl", "sv"]:
-    footer = format_footer(metadata, lang)
-    fig = plot_sweden_migration(pd, footer, lang)
-    plt.savefig(
-        f"Annual Immigration and Emigration in Sweden (1875-2023)-{lang}.svg",
-        dpi=150,
-        bbox_inches="tight",
-    )
-    plt.close()
+    build(CHARTS)
@@ -74,28 +74,32 @@ def plot_migration_rates(df):
     return fig, ax
 
 
-api_client = StatisticsSweden()
-
-fields = {
-    "Kon": ["1+2"],
-    "ContentsCode": [
-        "000000LV",
-        "0000001H",
-        "0000001F",
-        "000000LX",
-        "0000001G",
-    ],
-}
-
-df, metadata = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.POPULATION_CHANGES,
-    fields
-)
-
-migration_data = df[
-    ["year", "population", "immigrations", "emigrations"]
-].dropna()
-
-plot_migration_rates(df)
-
-plt.show()
+def main():
+    api_client = StatisticsSweden()
+
+    fields = {
+        "Kon": ["1+2"],
+        "ContentsCode": [
+            "000000LV",
+            "0000001H",
+            "0000001F",
+            "000000LX",
+            "0000001G",
+        ],
+    }
+
+    df, metadata = api_client.get_dataframe(
+        StatisticsSweden.Endpoint.POPULATION_CHANGES, fields
+    )
+
+    migration_data = df[
+        ["year", "population", "immigrations", "emigrations"]
+    ].dropna()
+
+    plot_migration_rates(df)
+
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,80 +1,7 @@
-from statistics_sweden import StatisticsSweden
-import pandas as pd
+import asyncio
 
-api_client = StatisticsSweden()
-
-df_groups, metadata1 = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.POPULATION_CITIZENSHIP_GROUP,
-    {"HDI": ["TOT"], "Kon": ["1+2"], "Alder": ["TOT1"], "Tid": ["2023"]},
-)
-
-df_groups.drop(["human_development_index", "sex", "age"], axis=1, inplace=True)
-df_groups = df_groups[df_groups.citizenship != "total"]
-df_groups["percentage"] = (
-    df_groups["number"] / df_groups["number"].sum() * 100
-).round(2)
-
-print(df_groups)
-
-df_citizenship, metadata = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.FOREIGN_CITIZENS_COUNTRY,
-    {
-        "Tid": ["2023"],
-        "Alder": ["tot"],
-    },
-)
-df_citizenship = df_citizenship[
-    df_citizenship.country_of_citizenship != "total"
-]
-
-df_citizenship = (
-    df_citizenship.groupby(["country_of_citizenship"])["number"]
-    .sum()
-    .reset_index()
-)
-
-df_citizenship.loc[len(df_citizenship)] = [
-    "Sweden",
-    df_groups[df_groups.citizenship == "Swedish citizenship"]["number"].values[
-        0
-    ],
-]
-
-df_citizenship["percentage"] = (
-    df_citizenship["number"] / df_groups["number"].sum() * 100
-).round(2)
-df_citizenship = df_citizenship.sort_values("number", ascending=False)
-
-print(df_citizenship[df_citizenship.number >= 10_000])
-
-df_birth_country, meta2 = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.POPULATION_BIRTH_COUNTRY, {"Tid": ["2023"]}
-)
-
-df_birth_country = (
-    df_birth_country.groupby(["country_of_birth"])["number"]
-    .sum()
-    .reset_index()
-)
-
-df_birth_country["percentage"] = (
-    df_birth_country["number"] / df_birth_country["number"].sum() * 100
-).round(2)
-
-df_birth_country = df_birth_country.sort_values("number", ascending=False)
-
-print(df_birth_country[df_birth_country["number"] >= 10_000])
-
-merged_df = pd.merge(
-    df_citizenship,
-    df_birth_country,
-    left_on="country_of_citizenship",
-    right_on="country_of_birth",
-    how="inner",
-    suffixes=("_citizenship", "_birth"),
-)
-
-print(merged_df)
+from statistics_sweden_async import AsyncStatisticsSweden
+import pandas as pd
 
 
 def format_wikitable(df, total, n=20):
@@ -95,4 +22,104 @@ def format_wikitable(df, total, n=20):
     return wiki
 
 
-# print(format_wikitable(df_citizenship, df_groups["number"].sum()))
+def main():
+    api_client = AsyncStatisticsSweden()
+    Endpoint = AsyncStatisticsSweden.Endpoint
+
+    (
+        (df_groups, metadata1),
+        (df_citizenship, metadata),
+        (df_birth_country, meta2),
+    ) = asyncio.run(
+        api_client.gather_dataframes(
+            [
+                (
+                    Endpoint.POPULATION_CITIZENSHIP_GROUP,
+                    {
+                        "HDI": ["TOT"],
+                        "Kon": ["1+2"],
+                        "Alder": ["TOT1"],
+                        "Tid": ["2023"],
+                    },
+                ),
+                (
+                    Endpoint.FOREIGN_CITIZENS_COUNTRY,
+                    {
+                        "Tid": ["2023"],
+                        "Alder": ["tot"],
+                    },
+                ),
+                (
+                    Endpoint.POPULATION_BIRTH_COUNTRY,
+                    {"Tid": ["2023"]},
+                ),
+            ]
+        )
+    )
+
+    df_groups.drop(
+        ["human_development_index", "sex", "age"], axis=1, inplace=True
+    )
+    df_groups = df_groups[df_groups.citizenship != "total"]
+    df_groups["percentage"] = (
+        df_groups["number"] / df_groups["number"].sum() * 100
+    ).round(2)
+
+    print(df_groups)
+
+    df_citizenship = df_citizenship[
+        df_citizenship.country_of_citizenship != "total"
+    ]
+
+    df_citizenship = (
+        df_citizenship.groupby(["country_of_citizenship"], observed=True)[
+            "number"
+        ]
+        .sum()
+        .reset_index()
+    )
+
+    df_citizenship.loc[len(df_citizenship)] = [
+        "Sweden",
+        df_groups[df_groups.citizenship == "Swedish citizenship"][
+            "number"
+        ].values[0],
+    ]
+
+    df_citizenship["percentage"] = (
+        df_citizenship["number"] / df_groups["number"].sum() * 100
+    ).round(2)
+    df_citizenship = df_citizenship.sort_values("number", ascending=False)
+
+    print(df_citizenship[df_citizenship.number >= 10_000])
+
+    df_birth_country = (
+        df_birth_country.groupby(["country_of_birth"], observed=True)["number"]
+        .sum()
+        .reset_index()
+    )
+
+    df_birth_country["percentage"] = (
+        df_birth_country["number"] / df_birth_country["number"].sum() * 100
+    ).round(2)
+
+    df_birth_country = df_birth_country.sort_values("number", ascending=False)
+
+    print(df_birth_country[df_birth_country["number"] >= 10_000])
+
+    merged_df = pd.merge(
+        df_citizenship,
+        df_birth_country,
+        left_on="country_of_citizenship",
+        right_on="country_of_birth",
+        how="inner",
+        suffixes=("_citizenship", "_birth"),
+    )
+
+    print(merged_df)
+
+    # print(format_wikitable(df_citizenship, df_groups["number"].sum()))
+
+
+if __name__ == "__main__":
+    main()
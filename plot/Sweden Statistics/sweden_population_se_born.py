@@ -1,28 +1,24 @@
-from dateutil import parser
-
 from matplotlib import pyplot as plt
-from matplotlib import font_manager as fm
 from matplotlib.ticker import PercentFormatter
 
+from charts import Chart, Dataset
 from colours import BangWongColors
+from footer import format_footer
+from plot_style import apply_style
 from statistics_sweden import StatisticsSweden
 
 
 def configure_plots():
-    _configure_fonts()
-
-    plt.rcParams.update(
+    apply_style(
         {
             # Text and font settings
             "font.size": 14,
-            "font.sans-serif": "Liberation Sans",
             "axes.labelsize": 12,
             "axes.titlesize": 22,
             "axes.titleweight": "bold",
             "xtick.labelsize": 14,
             "ytick.labelsize": 14,
             "legend.fontsize": 14,
-            "svg.fonttype": "none",
             # Grid settings
             "grid.alpha": 0.5,
             "grid.linestyle": "--",
@@ -35,37 +31,12 @@ def configure_plots():
     )
 
 
-def _configure_fonts():
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Regular.ttf"
-    )
-    fm.fontManager.addfont(
-        "/Users/mfloryan/Library/Fonts/LiberationSans-Bold.ttf"
-    )
-
-
 def create_figure():
     fig, ax = plt.subplots()
     ax.grid(True)
     return fig, ax
 
 
-def format_date(date_str):
-    date = parser.isoparse(date_str)
-    formatted_date = date.strftime("%-d %b %Y")
-    return formatted_date
-
-
-def format_footer(metadata):
-    return (
-        f"Source: {metadata[0]['source']}"
-        f" - {metadata[0]['label']}"
-        f" ({metadata[0]['infofile']}) - "
-        f"Updated: "
-        f"{format_date(metadata[0]['updated'])}"
-    )
-
-
 def add_footer(fig, text):
     fig.text(0, 0, text, wrap=True, ha="left", va="bottom", fontsize=10)
     fig.tight_layout(rect=[0, 0.02, 1, 1])
@@ -91,64 +62,45 @@ def plot_se_born_rate(df, footer_text):
     return fig
 
 
-api_client = StatisticsSweden()
-
-df, metadata = api_client.get_dataframe(
-    StatisticsSweden.Endpoint.POPULATION_REGION_BIRTH,
-    {
-        "Fodelseregion": ["TOTfod", "SE"],
-        "Kon": ["1+2"],
-        "Region": [
-            "01",
-            "03",
-            "04",
-            "05",
-            "06",
-            "07",
-            "08",
-            "09",
-            "10",
-            "12",
-            "13",
-            "14",
-            "17",
-            "18",
-            "19",
-            "20",
-            "21",
-            "22",
-            "23",
-            "24",
-            "25",
-        ],
-    },
-)
-
-df_summed = (
-    df.groupby(["year", "region_of_birth"])["number"].sum().reset_index()
-)
-
-df_wide = df_summed.pivot(
-    index="year", columns="region_of_birth", values="number"
-)
-
-df_wide = df_wide.rename(
-    columns={
-        "All birth countries": "total_population",
-        "Sweden": "swedish_born",
-    }
-).reset_index()
-
-df_wide["percent"] = df_wide["swedish_born"] / df_wide["total_population"]
-
-footer = format_footer(metadata)
-configure_plots()
-fig = plot_se_born_rate(df_wide, footer)
-
-fig.savefig(
-    "Percentage of Swedish-Born Population in Sweden (2000-2023).svg",
-    dpi=150,
-    bbox_inches="tight",
-)
-
-plt.show()
+def render_se_born_rate(df, metadata):
+    df_wide = df.pivot(
+        index="year", columns="region_of_birth", values="number"
+    )
+
+    df_wide = df_wide.rename(
+        columns={
+            "All birth countries": "total_population",
+            "Sweden": "swedish_born",
+        }
+    ).reset_index()
+
+    df_wide["percent"] = df_wide["swedish_born"] / df_wide["total_population"]
+
+    return plot_se_born_rate(df_wide, format_footer(metadata))
+
+
+CHARTS = [
+    Chart(
+        output=(
+            "Percentage of Swedish-Born Population in Sweden (2000-2023).svg"
+        ),
+        datasets=(
+            Dataset(
+                StatisticsSweden.Endpoint.POPULATION_REGION_BIRTH,
+                {
+                    "Fodelseregion": ["TOTfod", "SE"],
+                    "Kon": ["1+2"],
+                },
+                ("Region", "Kon"),
+            ),
+        ),
+        render=render_se_born_rate,
+        configure=configure_plots,
+    )
+]
+
+
+if __name__ == "__main__":
+    from build_charts import build
+
+    build(CHARTS)
@@ -0,0 +1,85 @@
+import argparse
+import sys
+
+# Only the standard library is imported up front: pandas, matplotlib and the
+# HTTP client are loaded by the subcommand that needs them, so --help and
+# argument errors come back immediately and nothing touches the network or
+# the caches at import time.
+
+
+def show_fields(args: argparse.Namespace):
+    from statistics_sweden import StatisticsSweden
+
+    try:
+        endpoint = StatisticsSweden.Endpoint[args.endpoint]
+    except KeyError:
+        names = ", ".join(e.name for e in StatisticsSweden.Endpoint)
+        sys.exit(f"Unknown endpoint {args.endpoint}, expected one of: {names}")
+
+    StatisticsSweden().show_fields(endpoint)
+
+
+def render(args: argparse.Namespace):
+    import build_charts
+
+    unknown = sorted(set(args.charts) - set(build_charts.CHART_MODULES))
+    if unknown:
+        sys.exit(
+            f"Unknown chart module {', '.join(unknown)}, expected one of: "
+            f"{', '.join(build_charts.CHART_MODULES)}"
+        )
+
+    build_charts.build(
+        build_charts.discover_charts(
+            args.charts or build_charts.CHART_MODULES
+        ),
+        workers=args.workers,
+        force=args.force,
+        thumbnails=tuple(args.png),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="sweden_stats",
+        description="Statistics Sweden (SCB) tables and charts",
+    )
+    commands = parser.add_subparsers(required=True, metavar="command")
+
+    fields = commands.add_parser(
+        "fields", help="list the variables and value codes of a table"
+    )
+    fields.add_argument(
+        "endpoint",
+        help="StatisticsSweden.Endpoint name, e.g. POPULATION_CHANGES",
+    )
+    fields.set_defaults(command=show_fields)
+
+    charts = commands.add_parser(
+        "render", help="render charts whose data or code has changed"
+    )
+    charts.add_argument(
+        "charts",
+        nargs="*",
+        help="chart modules to render, e.g. sweden_migration (default: all)",
+    )
+    charts.add_argument("--workers", type=int, help="render processes")
+    charts.add_argument(
+        "--force", action="store_true", help="render unchanged charts too"
+    )
+    charts.add_argument(
+        "--png",
+        nargs="+",
+        type=int,
+        default=[],
+        metavar="WIDTH",
+        help="also write PNG thumbnails this many pixels wide",
+    )
+    charts.set_defaults(command=render)
+
+    args = parser.parse_args(argv)
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The chart scripts import each other as top-level modules from their own
+# directory, and the mock PxWeb server lives with the benchmarks
+HERE = Path(__file__).resolve().parent
+sys.path[:0] = [str(HERE.parent), str(HERE.parent / "benchmarks")]
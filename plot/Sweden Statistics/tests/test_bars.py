@@ -0,0 +1,63 @@
+import numpy as np
+from matplotlib import pyplot as plt
+
+from bars import bar_series
+
+YEARS = np.arange(1990, 2024)
+HEIGHTS = np.sin(YEARS / 3) * 1000 + 400
+
+
+def _axes(draw):
+    fig, ax = plt.subplots()
+    draw(ax)
+    legend = ax.legend()
+    return fig, ax, legend
+
+
+# A bar series must scale, clip and label like the ax.bar it replaces
+def test_bar_series_matches_ax_bar():
+    def bar(ax):
+        ax.bar(YEARS, HEIGHTS, width=0.8, color="#4e79a7", label="Immigration")
+
+    def series(ax):
+        bar_series(
+            ax, YEARS, HEIGHTS, width=0.8, color="#4e79a7", label="Immigration"
+        )
+
+    bar_fig, bar_ax, bar_legend = _axes(bar)
+    fig, ax, legend = _axes(series)
+
+    np.testing.assert_allclose(
+        ax.dataLim.get_points(), bar_ax.dataLim.get_points()
+    )
+    np.testing.assert_allclose(ax.get_xlim(), bar_ax.get_xlim())
+    np.testing.assert_allclose(ax.get_ylim(), bar_ax.get_ylim())
+
+    (patch,) = ax.patches
+    assert len(bar_ax.patches) == len(YEARS)
+    assert patch.sticky_edges.y == [0]
+    assert {tuple(bar.sticky_edges.y) for bar in bar_ax.patches} == {(0,)}
+
+    (handle,) = legend.get_patches()
+    (bar_handle,) = bar_legend.get_patches()
+    assert [text.get_text() for text in legend.get_texts()] == ["Immigration"]
+    assert handle.get_facecolor() == bar_handle.get_facecolor()
+    assert handle.get_edgecolor() == bar_handle.get_edgecolor()
+
+    plt.close(fig)
+    plt.close(bar_fig)
+
+
+def test_bar_series_skips_missing_values():
+    fig, ax = plt.subplots()
+    heights = HEIGHTS.copy()
+    heights[[0, -1]] = np.nan
+
+    patch = bar_series(ax, YEARS, heights, bottom=100)
+
+    assert len(patch.get_path().vertices) == 5 * (len(YEARS) - 2)
+    assert patch.sticky_edges.y == [100]
+    np.testing.assert_allclose(
+        ax.dataLim.intervalx, [YEARS[1] - 0.4, YEARS[-2] + 0.4]
+    )
+    plt.close(fig)
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+import build_charts
+from charts import Chart
+
+
+def _draw():
+    from matplotlib import pyplot as plt
+
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1])
+    return fig
+
+
+def _fail():
+    raise ValueError("No data to draw")
+
+
+def test_failed_chart_keeps_the_others_in_the_manifest(tmp_path, monkeypatch):
+    work = tmp_path / "plot" / "Sweden Statistics"
+    work.mkdir(parents=True)
+    monkeypatch.chdir(work)
+
+    charts = [Chart("drawn.svg", (), _draw), Chart("failed.svg", (), _fail)]
+    with pytest.raises(ExceptionGroup) as raised:
+        build_charts.build(charts, workers=2)
+
+    (error,) = raised.value.exceptions
+    assert str(error) == "No data to draw"
+    assert error.__notes__ == ["Rendering failed.svg"]
+
+    manifest = json.loads((work / build_charts.MANIFEST_FILE).read_text())
+    assert list(manifest) == ["drawn.svg"]
+    assert (work / "drawn.svg").exists()
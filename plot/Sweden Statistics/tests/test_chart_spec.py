@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+
+import build_charts
+from chart_spec import ChartSpec, ColourGroup, compile_specs
+from charts import Dataset, LocalizedChart
+from statistics_sweden import StatisticsSweden
+
+DATASET = Dataset(StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY)
+METADATA = [
+    {
+        "source": "Statistics Sweden",
+        "label": "Migration by country of birth",
+        "infofile": "BE0101",
+        "updated": "2024-02-21T08:00:00",
+    }
+]
+TEXT = {
+    "en": {"title": "Shares", "x_label": "Percent", "Nordic": "Nordic"},
+    "sv": {
+        "title": "Andelar",
+        "x_label": "Procent",
+        "Nordic": "Norden",
+        "source": "Källa",
+        "updated": "Uppdaterad",
+    },
+}
+GROUPS = (
+    ColourGroup("Nordic", "#0072b2", ("Norway", "Finland")),
+    ColourGroup("Other", "#e69f00", ("Poland",)),
+)
+
+
+def shares(df):
+    return df.set_index("country")["share"].sort_values()
+
+
+def _spec(**kwargs):
+    spec = dict(
+        output="shares-{lang}.svg",
+        dataset=DATASET,
+        kind="share_bars",
+        text=TEXT,
+        transforms=(shares,),
+        groups=GROUPS,
+    )
+    return ChartSpec(**{**spec, **kwargs})
+
+
+def _frame():
+    return pd.DataFrame(
+        {"country": ["Finland", "Poland", "Norway"], "share": [40.0, 35, 25]}
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"kind": "pie"}, "unknown kind 'pie'"),
+        ({"text": {}}, "no text in any language"),
+        ({"output": "shares.svg"}, "needs an output name with a {lang}"),
+        (
+            {"text": {**TEXT, "pl": {"title": "Udziały"}}},
+            "no x_label in 'pl' text",
+        ),
+    ],
+)
+def test_invalid_specs_are_rejected(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        _spec(**kwargs)
+
+
+def test_spec_renders_every_language_through_its_chart():
+    (chart,) = compile_specs([_spec()])
+    assert isinstance(chart, LocalizedChart)
+    assert chart.datasets == (DATASET,)
+    assert chart.outputs == ["shares-en.svg", "shares-sv.svg"]
+
+    figures = []
+    for output, fig in chart.figures([(_frame(), METADATA)]):
+        ax = fig.axes[0]
+        legend = [text.get_text() for text in ax.get_legend().get_texts()]
+        footer = fig.texts[-1].get_text()
+        figures.append((output, ax.get_title(), ax.get_xlabel(), legend))
+
+        bars = {
+            label.get_text(): bar.get_facecolor()
+            for label, bar in zip(ax.get_yticklabels(), ax.patches)
+        }
+        assert list(bars) == ["Norway", "Poland", "Finland"]
+        assert bars["Norway"] == bars["Finland"] != bars["Poland"]
+
+    assert figures == [
+        ("shares-en.svg", "Shares", "Percent", ["Nordic", "Other"]),
+        ("shares-sv.svg", "Andelar", "Procent", ["Norden", "Other"]),
+    ]
+    assert footer == (
+        "Källa: Statistics Sweden - Migration by country of birth (BE0101)"
+        " - Uppdaterad: 21 feb 2024"
+    )
+
+
+def test_single_language_spec_is_written_by_the_build(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (chart,) = compile_specs(
+        [_spec(output="shares.svg", text={"en": TEXT["en"]})]
+    )
+    assert chart.outputs == ["shares.svg"]
+
+    timings = build_charts.render_chart(chart, [(_frame(), METADATA)])
+
+    assert list(timings) == ["shares.svg"]
+    svg = (tmp_path / "shares.svg").read_text()
+    for group in GROUPS:
+        assert group.colour in svg
@@ -0,0 +1,47 @@
+import pytest
+
+from footer import MONTH_ABBREVIATIONS, format_date, format_footer
+
+
+@pytest.mark.parametrize(
+    "date, lang, expected",
+    [
+        ("2024-02-21T08:00:00", "en", "21 Feb 2024"),
+        ("2024-02-21T08:00:00", "sv", "21 feb 2024"),
+        ("2024-02-21T08:00:00", "pl", "21 lut 2024"),
+        ("2023-05-01", "en", "1 May 2023"),
+        ("2023-05-01", "sv", "1 maj 2023"),
+        ("2023-10-09T23:59:59", "sv", "9 okt 2023"),
+        ("2023-10-09T23:59:59", "pl", "9 paź 2023"),
+        ("2022-12-31T00:00:00Z", "en", "31 Dec 2022"),
+    ],
+)
+def test_format_date(date, lang, expected):
+    assert format_date(date, lang) == expected
+
+
+def test_every_language_names_twelve_distinct_months():
+    for months in MONTH_ABBREVIATIONS.values():
+        assert len(set(months)) == 12
+
+
+def test_format_footer():
+    metadata = [
+        {
+            "source": "Statistics Sweden",
+            "label": "Population by region",
+            "infofile": "BE0101",
+            "updated": "2024-02-21T08:00:00",
+        }
+    ]
+
+    assert format_footer(metadata) == (
+        "Source: Statistics Sweden - Population by region (BE0101)"
+        " - Updated: 21 Feb 2024"
+    )
+    assert format_footer(
+        metadata, "sv", source="Källa", updated="Uppdaterad"
+    ) == (
+        "Källa: Statistics Sweden - Population by region (BE0101)"
+        " - Uppdaterad: 21 feb 2024"
+    )
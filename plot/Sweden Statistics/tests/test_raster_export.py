@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from PIL import Image
+
+from raster_export import export_thumbnails
+
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+
+# A 4×2in figure filled by a tiny PNG, red on the left and blue on the
+# right; bbox_inches="tight" pads it to 4.2×2.2in
+@pytest.fixture
+def figure(tmp_path):
+    pixels = np.zeros((2, 4, 3), dtype=np.uint8)
+    pixels[:, :2] = RED
+    pixels[:, 2:] = BLUE
+    Image.fromarray(pixels).save(tmp_path / "tiny.png")
+
+    fig = Figure(figsize=(4, 2))
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.imshow(np.asarray(Image.open(tmp_path / "tiny.png")), aspect="auto")
+    ax.set_axis_off()
+    return fig
+
+
+@pytest.mark.parametrize("widths", [(320, 640, 1280), (1000, 50)])
+def test_thumbnails_have_the_widths_and_the_aspect_ratio(
+    figure, tmp_path, widths
+):
+    directory = tmp_path / "thumbnails"
+    paths = export_thumbnails(
+        figure, "chart.svg", widths, directory=str(directory)
+    )
+
+    assert paths == [
+        str(directory / f"chart-{width}px.png") for width in sorted(widths)
+    ]
+    for width, path in zip(sorted(widths), paths):
+        with Image.open(path) as image:
+            assert image.width == width
+            assert image.height == pytest.approx(width * 2.2 / 4.2, abs=1)
+
+            # The image is scaled, not cropped or squeezed to one side
+            rgb = image.convert("RGB")
+            middle = image.height // 2
+            assert rgb.getpixel((width * 3 // 10, middle)) == RED
+            assert rgb.getpixel((width * 7 // 10, middle)) == BLUE
+
+
+def test_no_widths_write_nothing(figure, tmp_path):
+    directory = tmp_path / "thumbnails"
+    assert (
+        export_thumbnails(figure, "chart.svg", (), directory=directory) == []
+    )
+    assert not directory.exists()
@@ -0,0 +1,263 @@
+import asyncio
+import copy
+
+import pandas as pd
+import pytest
+
+from metadata_store import MetadataStore
+from mock_pxweb import MockPxWeb, isolated, table_metadata
+from statistics_sweden import StatisticsSweden
+from statistics_sweden_async import AsyncStatisticsSweden
+
+ENDPOINT = StatisticsSweden.Endpoint.MIGRATION_BIRTH_COUNTRY
+OLD = "2024-02-21T08:00:00"
+NEW = "2024-03-21T08:00:00"
+
+
+# Two scripts query the same table; a new release adding 2003 lands after
+# the first has fetched. Later builds must see the new release for both
+# queries, and once they have, be served from the stores alone.
+def test_release_between_two_queries_on_one_table():
+    old = table_metadata(countries=3, years=range(2000, 2003))
+    new = table_metadata(countries=3, years=range(2000, 2004))
+    by_sex = {"Kon": ["1"]}
+
+    with (
+        MockPxWeb(old, updated=OLD) as server,
+        isolated(StatisticsSweden, server),
+    ):
+        StatisticsSweden().get_dataframe(ENDPOINT)
+        server.release(new, NEW)
+        StatisticsSweden().get_dataframe(ENDPOINT, by_sex)
+
+        for _ in range(2):
+            client = StatisticsSweden()
+            for fields in (None, by_sex):
+                df, metadata = client.get_dataframe(ENDPOINT, fields)
+                assert df["year"].max() == 2003
+                assert metadata[0]["updated"] == NEW
+            assert (
+                client.metadata_store.updated(
+                    ENDPOINT.value, StatisticsSweden.LANGUAGE
+                )
+                == NEW
+            )
+
+        requests = server.stats["GET"] + server.stats["POST"]
+        client = StatisticsSweden()
+        for fields in (None, by_sex):
+            client.get_dataframe(ENDPOINT, fields)
+        assert server.stats["GET"] + server.stats["POST"] == requests
+        assert client.dataset_store.stats["hits"] == 2
+
+
+def test_metadata_store_keeps_the_newest_release(tmp_path):
+    store = MetadataStore(tmp_path)
+    store.put("T", "en", {"variables": []}, updated=NEW)
+
+    assert not store.validate("T", "en", OLD)
+    assert store.updated("T", "en") == NEW
+    assert store.get("T", "en") is not None
+
+    store.put("T", "en", {"variables": []}, updated=OLD)
+    assert store.updated("T", "en") == NEW
+    assert store.validate("T", "en", NEW)
+
+
+def test_async_client_follows_a_release():
+    old = table_metadata(countries=3, years=range(2000, 2003))
+    new = table_metadata(countries=3, years=range(2000, 2004))
+
+    with (
+        MockPxWeb(old, updated=OLD) as server,
+        isolated(StatisticsSweden, server),
+    ):
+        StatisticsSweden().get_dataframe(ENDPOINT)
+        server.release(new, NEW)
+        StatisticsSweden().get_dataframe(ENDPOINT, {"Kon": ["1"]})
+        results = asyncio.run(
+            AsyncStatisticsSweden().gather_dataframes(
+                [ENDPOINT, (ENDPOINT, {"Kon": ["1"]})]
+            )
+        )
+
+    for df, metadata in results:
+        assert df["year"].max() == 2003
+        assert metadata[0]["updated"] == NEW
+
+
+def test_async_client_keeps_to_the_rate_limit(monkeypatch):
+    monkeypatch.setattr(StatisticsSweden, "MAX_CALLS", 4)
+    monkeypatch.setattr(StatisticsSweden, "CALL_PERIOD", 0.5)
+    monkeypatch.setattr(StatisticsSweden, "MAX_CELLS", 40)
+    metadata = table_metadata(countries=10, years=range(2000, 2005))
+
+    with MockPxWeb(metadata) as server, isolated(StatisticsSweden, server):
+        ((df, _),) = asyncio.run(
+            AsyncStatisticsSweden().gather_dataframes([ENDPOINT])
+        )
+
+    assert len(df) == 100
+    times = [sent for sent, _ in server.requests]
+    assert len(times) == 6
+    # No five requests within one period (less some scheduling slack)
+    assert all(later - sent > 0.45 for sent, later in zip(times, times[4:]))
+
+
+def _fetch(metadata, response_format, fail_with=None):
+    # Each format from empty caches, or the dataset store would answer the
+    # second query with the first frame
+    with MockPxWeb(metadata) as server, isolated(StatisticsSweden, server):
+        client = StatisticsSweden()
+        if fail_with:
+            # Fail the query, not the metadata request before it
+            client._get_metadata(ENDPOINT)
+            server.fail_next(fail_with)
+        df, response_metadata = client.get_dataframe(
+            ENDPOINT, {"Kon": ["2"]}, response_format=response_format
+        )
+    return df, response_metadata, server.stats["POST"]
+
+
+def test_json_stat2_gives_the_json_frame():
+    metadata = table_metadata(countries=3)
+
+    df, response_metadata, _ = _fetch(metadata, "json")
+    stat_df, stat_metadata, posts = _fetch(metadata, "json-stat2")
+
+    assert stat_df.equals(df)
+    assert stat_metadata == response_metadata
+    assert posts == 1
+
+
+@pytest.mark.parametrize("failure", ["decode", "http"])
+def test_json_stat2_falls_back_to_json(failure, monkeypatch):
+    metadata = table_metadata(countries=3)
+    df, response_metadata, _ = _fetch(metadata, "json")
+
+    if failure == "decode":
+
+        def fail(dataset, metadata):
+            raise KeyError("role")
+
+        monkeypatch.setattr(
+            StatisticsSweden, "_transform_json_stat", staticmethod(fail)
+        )
+
+    with pytest.warns(UserWarning, match="falling back to json"):
+        fallback_df, fallback_metadata, posts = _fetch(
+            metadata, "json-stat2", 400 if failure == "http" else None
+        )
+
+    assert fallback_df.equals(df)
+    assert fallback_metadata == response_metadata
+    assert posts == 2
+
+
+def _with_total_sex(metadata):
+    metadata = copy.deepcopy(metadata)
+    sex = metadata["variables"][1]
+    sex["values"] = [*sex["values"], "1+2"]
+    sex["valueTexts"] = [*sex["valueTexts"], "total"]
+    return metadata
+
+
+def test_aggregate_eliminates_a_variable():
+    metadata = table_metadata(countries=3, years=range(2000, 2003))
+    query = StatisticsSweden._build_query(metadata, {"Kon": ["1", "2"]})
+
+    pushed, reduce = StatisticsSweden._push_down(query, metadata, ["Kon"])
+    assert [field["code"] for field in pushed["query"]] == ["Fodelseland"]
+    assert reduce == []
+
+    with MockPxWeb(metadata) as server, isolated(StatisticsSweden, server):
+        df, _ = StatisticsSweden().get_dataframe(ENDPOINT, aggregate=["Kon"])
+
+    assert "sex" not in df.columns
+    assert len(df) == 3 * 3
+
+
+def test_aggregate_selects_a_summed_code():
+    metadata = _with_total_sex(table_metadata(countries=3))
+    fields = {"Fodelseland": ["C0000"], "Kon": ["1", "2"]}
+    query = StatisticsSweden._build_query(metadata, fields)
+
+    pushed, reduce = StatisticsSweden._push_down(query, metadata, ["Kon"])
+    sex = next(field for field in pushed["query"] if field["code"] == "Kon")
+    assert sex["selection"]["values"] == ["1+2"]
+    assert reduce == ["Kon"]
+
+    with MockPxWeb(metadata) as server, isolated(StatisticsSweden, server):
+        df, _ = StatisticsSweden().get_dataframe(
+            ENDPOINT, fields, aggregate=["Kon"]
+        )
+
+    assert list(df.columns) == [
+        "country_of_birth",
+        "year",
+        "immigrations",
+        "emigrations",
+    ]
+    assert len(df) == len(metadata["variables"][3]["values"])
+
+
+def test_aggregate_reduces_locally():
+    metadata = table_metadata(countries=5, years=range(2000, 2004))
+    fields = {"Fodelseland": ["C0001", "C0003"]}
+
+    with MockPxWeb(metadata) as server, isolated(StatisticsSweden, server):
+        client = StatisticsSweden()
+        df, _ = client.get_dataframe(ENDPOINT, fields)
+        reduced, _ = client.get_dataframe(
+            ENDPOINT, fields, aggregate=["Fodelseland"]
+        )
+
+    expected = (
+        df.groupby(["sex", "year"], observed=True, sort=False)[
+            ["immigrations", "emigrations"]
+        ]
+        .sum()
+        .reset_index()
+    )
+    assert reduced.equals(expected)
+    assert len(reduced) == 2 * 4
+
+
+def _years(query):
+    (years,) = (field for field in query["query"] if field["code"] == "Tid")
+    return years["selection"]["values"]
+
+
+# A release adds 2003; the refresh fetches it and the last stored year,
+# which SCB may have revised, and splices them into the stored frame
+@pytest.mark.parametrize(
+    "overlap, fetched", [(1, ["2002", "2003"]), (0, ["2003"])]
+)
+def test_refresh_fetches_only_new_periods(overlap, fetched):
+    old = table_metadata(countries=3, years=range(2000, 2003))
+    new = table_metadata(countries=3, years=range(2000, 2004))
+
+    with (
+        MockPxWeb(old, updated=OLD) as server,
+        isolated(StatisticsSweden, server),
+    ):
+        StatisticsSweden().get_dataframe(ENDPOINT)
+        server.release(new, NEW)
+        df, metadata = StatisticsSweden().refresh_dataframe(
+            ENDPOINT, overlap=overlap
+        )
+        (query,) = server.queries[1:]
+
+        posts = server.stats["POST"]
+        stored, _ = StatisticsSweden().get_dataframe(ENDPOINT)
+        assert server.stats["POST"] == posts
+
+    assert _years(query) == fetched
+    assert metadata[0]["updated"] == NEW
+    keys = ["country_of_birth", "sex", "year"]
+    assert len(df) == 3 * 2 * 4
+    assert not df.duplicated(keys).any()
+    assert sorted(df["year"].unique()) == [2000, 2001, 2002, 2003]
+    for key in ("country_of_birth", "sex"):
+        assert isinstance(df[key].dtype, pd.CategoricalDtype)
+    assert stored.equals(df)
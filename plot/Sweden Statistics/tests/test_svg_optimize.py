@@ -0,0 +1,89 @@
+import shutil
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from svg_optimize import HREF, REFERENCE, SVG_NS, optimize_svg
+
+CHARTS = Path(__file__).resolve().parent.parent
+TEXT = f"{{{SVG_NS}}}text"
+
+
+def _texts(root: ET.Element) -> list:
+    return ["".join(text.itertext()) for text in root.iter(TEXT)]
+
+
+def _dangling(root: ET.Element) -> set:
+    ids = {element.get("id") for element in root.iter()}
+    referenced = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if name == HREF and value.startswith("#"):
+                referenced.add(value[1:])
+            else:
+                referenced.update(REFERENCE.findall(value))
+    return referenced - ids
+
+
+# The charts committed here, as matplotlib wrote them
+@pytest.mark.parametrize(
+    "svg", sorted(CHARTS.glob("*.svg")), ids=lambda path: path.stem
+)
+def test_optimize_committed_chart(svg, tmp_path):
+    path = tmp_path / svg.name
+    shutil.copy(svg, path)
+    before = ET.parse(path).getroot()
+
+    report = optimize_svg(path)
+    optimized = path.read_bytes()
+    after = ET.fromstring(optimized)
+
+    assert report.size_after < report.size_before
+    assert report.elements_after < report.elements_before
+    assert _dangling(after) == set()
+    assert _texts(after) == _texts(before)
+
+    optimize_svg(path)
+    assert path.read_bytes() == optimized
+
+
+def _bar(d: str) -> str:
+    return f'<g><path d="{d}" style="fill: #1f77b4"/></g>'
+
+
+def test_merges_only_paths_that_do_not_overlap(tmp_path):
+    path = tmp_path / "bars.svg"
+    square = "M 0 0 L 10 0 L 10 10 L 0 10 z"
+    # Overlaps the square, wound the other way
+    overlapping = "M 5 5 L 5 15 L 15 15 L 15 5 z"
+    # Only touches the one before
+    stacked = "M 5 15 L 15 15 L 15 25 L 5 25 z"
+    path.write_text(
+        f'<svg xmlns="{SVG_NS}">'
+        + "".join(map(_bar, (square, overlapping, stacked)))
+        + "</svg>"
+    )
+
+    optimize_svg(path)
+
+    paths = ET.parse(path).getroot().iter(f"{{{SVG_NS}}}path")
+    assert [element.get("d") for element in paths] == [
+        square,
+        f"{overlapping} {stacked}",
+    ]
+
+
+def test_keeps_transforms_exact(tmp_path):
+    path = tmp_path / "scaled.svg"
+    transform = "matrix(0.0254 0 0 -0.0254 12.3456 78.9012)"
+    path.write_text(
+        f'<svg xmlns="{SVG_NS}"><g transform="{transform}">'
+        '<path d="M 0.123 0 L 1 1"/></g></svg>'
+    )
+
+    optimize_svg(path)
+
+    root = ET.parse(path).getroot()
+    assert root.find(f"{{{SVG_NS}}}g").get("transform") == transform
+    assert root.find(f".//{{{SVG_NS}}}path").get("d") == "M 0.12 0 L 1 1"
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "sweden_stats.py"
+HEAVY = {"pandas", "numpy", "matplotlib", "requests", "requests_cache"}
+
+
+def _imported(*args: str) -> set:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", SCRIPT, *args],
+        capture_output=True,
+        text=True,
+        cwd=SCRIPT.parent,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | imported package"
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+@pytest.mark.parametrize("args", [["--help"], ["render", "--help"]])
+def test_help_imports_no_heavy_modules(args):
+    assert _imported(*args) & HEAVY == set()